@@ -0,0 +1,411 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+오프라인 벤치마크: GitHub(PyGithub `Github`)/OpenAI(`OpenAI`) 대신 로컬 대역을 끼워
+main.py 전체 파이프라인과 summarize_commit 청크 분할을 실제 네트워크 없이 측정한다.
+
+    python bench.py                                  # 기본 시나리오 세트
+    python bench.py --commits 10,100 --files 1,50    # 커밋 수 × 파일 수 조합
+    python bench.py --llm-error-rate 0.05 --json bench.json
+"""
+
+import os, json, time, atexit, random, shutil, argparse, tempfile, threading, datetime as dt
+from typing import List, Optional, Dict, Any
+
+# main 을 import 하기 전에 외부 의존 설정을 고정 (.env 보다 우선)
+_BENCH_DIR = tempfile.mkdtemp(prefix="bench_")
+atexit.register(shutil.rmtree, _BENCH_DIR, ignore_errors=True)
+os.environ.update({
+    "OUT_DIR": _BENCH_DIR,
+    "COMMIT_SOURCE": "github",
+    "GITHUB_GRAPHQL": "0",
+    "INCREMENTAL": "0",
+    "CACHE_ENABLED": os.environ.get("BENCH_CACHE", "0"),
+    "MY_GITHUB_LOGIN": "bench-user",
+    "MY_GITHUB_EMAIL": "bench@example.com",
+    "LOG_LEVEL": os.environ.get("LOG_LEVEL", "WARNING"),
+    "GITHUB_TOKEN": "ghp_bench",
+    "OPENAI_API_KEY": "sk-bench",
+})
+
+import httpx
+import openai
+from tenacity import wait_fixed
+from github import RateLimitExceededException
+
+import main
+
+# ======================================
+# 🧪 1. GitHub 대역
+# ======================================
+class _Obj:
+    def __init__(self, **kw):
+        self.__dict__.update(kw)
+
+class _Paginated:
+    def __init__(self, pages):
+        self._pages = pages
+
+    def __iter__(self):
+        return self._pages()
+
+class _Latency:
+    """지연/오류 주입 (평균 latency 초, ±50% 지터)"""
+    def __init__(self, latency: float, error_rate: float, seed: int):
+        self.latency = latency
+        self.error_rate = error_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sleep(self):
+        with self._lock:
+            d = self.latency * self._rng.uniform(0.5, 1.5)
+        if d > 0:
+            time.sleep(d)
+
+    def should_fail(self) -> bool:
+        with self._lock:
+            return self.error_rate > 0 and self._rng.random() < self.error_rate
+
+def _synthetic_patch(rng: random.Random, lines: int) -> str:
+    out = [f"@@ -1,{lines} +1,{lines} @@"]
+    for i in range(lines):
+        word = "".join(rng.choice("abcdefghij") for _ in range(12))
+        out.append(f"-    value_{i} = old_{word}()")
+        out.append(f"+    value_{i} = new_{word}()")
+    return "\n".join(out)
+
+class FakeRepo:
+    """하루치 합성 커밋을 재생하는 Repository 대역"""
+    def __init__(self, gh: "FakeGithub", full_name: str, day: dt.date, commits: int, files: int,
+                 patch_lines: int, seed: int):
+        self.gh = gh
+        self.full_name = full_name
+        rng = random.Random(seed)
+        _, start_utc, end_utc = main.get_kst_day_bounds(day)
+        step = (end_utc - start_utc) / (commits + 1)
+        self._commits = []
+        self._files: Dict[str, List[Any]] = {}
+        for k in range(commits):
+            sha = "%040x" % rng.getrandbits(160)
+            when = (end_utc - step * (k + 1)).replace(tzinfo=None)  # PyGithub 와 같은 naive UTC
+            author = _Obj(name="Bench User", email="bench@example.com", date=when)
+            self._commits.append(_Obj(
+                sha=sha,
+                author=_Obj(login="bench-user"),
+                commit=_Obj(author=author, committer=author, message=f"bench commit {k}\n\nsynthetic")
+            ))
+            self._files[sha] = [
+                _Obj(filename=f"src/module_{k}/file_{j}.py", status="modified",
+                     patch=_synthetic_patch(rng, patch_lines), additions=patch_lines, deletions=patch_lines,
+                     previous_filename=None)
+                for j in range(files)
+            ]
+
+    def get_commits(self, sha=None, since=None, until=None, author=None, **kw):
+        # PaginatedList 처럼 순회 시점에 페이지(100개)마다 요청이 나간다
+        def pages():
+            matched = [
+                c for c in self._commits
+                if (since is None or main._as_utc(c.commit.committer.date) >= since)
+                and (until is None or main._as_utc(c.commit.committer.date) < until)
+                and (author is None or author in ("bench-user", "bench@example.com"))
+            ]
+            for i in range(0, max(len(matched), 1), 100):
+                self.gh._call("list_commits")
+                yield from matched[i:i + 100]
+        return _Paginated(pages)
+
+    def get_commit(self, sha: str):
+        self.gh._call("get_commit")
+        c = next(c for c in self._commits if c.sha == sha)
+        return _Obj(sha=sha, author=c.author, commit=c.commit, files=self._files[sha])
+
+class _FakeRequester:
+    """PyGithub Requester 대역: 요청 1회 = `__requestRaw` 1회 (main.count_github_requests 가 여기서 센다)"""
+    def __init__(self, gh: "FakeGithub"):
+        self.gh = gh
+
+    def _Requester__requestRaw(self, name: str):
+        gh = self.gh
+        with gh._lock:
+            gh.calls[name] = gh.calls.get(name, 0) + 1
+        gh.sim.sleep()
+        if gh.sim.should_fail():
+            raise RateLimitExceededException(403, {"message": "simulated rate limit"}, {"retry-after": "1"})
+
+class FakeGithub:
+    """PyGithub `Github` 대역: 호출 수 집계, 지연, Rate limit(429/403) 오류 주입"""
+    def __init__(self, latency: float, error_rate: float, seed: int):
+        self.sim = _Latency(latency, error_rate, seed)
+        self.repos: Dict[str, FakeRepo] = {}
+        self.calls: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._Github__requester = _FakeRequester(self)
+        self.rate_limiting = (5000, 5000)
+        self.rate_limiting_resettime = int(time.time()) + 3600
+
+    def _call(self, name: str):
+        self._Github__requester._Requester__requestRaw(name)
+
+    def get_repo(self, full_name: str, lazy: bool = False):
+        if not lazy:
+            self._call("get_repo")
+        return self.repos[full_name]
+
+# ======================================
+# 🤖 2. OpenAI 대역
+# ======================================
+class FakeOpenAI:
+    """`OpenAI` 대역: 프롬프트 종류별로 그럴듯한 JSON 응답, 지연, 429/5xx 오류 주입, 스키마에 안 맞는 응답 주입.
+    Batch API(/files, /batches)도 흉내 내며, 배치는 몇 번 폴링된 뒤 완료된다"""
+    def __init__(self, latency: float, error_rate: float, seed: int, batch_polls: int = 2, invalid_rate: float = 0.0):
+        self.sim = _Latency(latency, error_rate, seed)
+        self.invalid = _Latency(0.0, invalid_rate, seed + 1)
+        self.models: Dict[str, int] = {}
+        self.calls = 0
+        self.errors = 0
+        self.batch_requests = 0
+        self.latencies: List[float] = []
+        self._lock = threading.Lock()
+        self.chat = _Obj(completions=_Obj(create=self._create))
+        self.files = _Obj(create=self._file_create, content=self._file_content)
+        self.batch_polls = batch_polls
+        self._files: Dict[str, str] = {}
+        self._batches: Dict[str, Dict[str, Any]] = {}
+
+    def _file_create(self, file, purpose: str):
+        name, data = file
+        with self._lock:
+            file_id = f"file-{len(self._files)}"
+            self._files[file_id] = data.decode("utf-8")
+        return _Obj(id=file_id, filename=name, purpose=purpose)
+
+    def _file_content(self, file_id: str):
+        return _Obj(text=self._files[file_id])
+
+    def post(self, path: str, cast_to=None, body=None, **kw):
+        assert path == "/batches", path
+        with self._lock:
+            batch_id = f"batch_{len(self._batches)}"
+            self._batches[batch_id] = {"id": batch_id, "status": "validating", "input_file_id": body["input_file_id"],
+                                       "polls": 0, "request_counts": {"total": 0, "completed": 0, "failed": 0}}
+        return {k: v for k, v in self._batches[batch_id].items() if k != "polls"}
+
+    def get(self, path: str, cast_to=None, **kw):
+        batch = self._batches[path.rsplit("/", 1)[-1]]
+        batch["polls"] += 1
+        if batch["status"] != "completed":
+            batch["status"] = "in_progress"
+            if batch["polls"] > self.batch_polls:
+                self._run_batch(batch)
+        return {k: v for k, v in batch.items() if k != "polls"}
+
+    def _run_batch(self, batch: Dict[str, Any]):
+        """입력 JSONL 을 (지연 없이) 처리해 출력 파일 생성. 오류 주입 비율만큼은 실패로 뺀다"""
+        out, failed = [], 0
+        lines = [json.loads(l) for l in self._files[batch["input_file_id"]].splitlines() if l.strip()]
+        for req in lines:
+            with self._lock:
+                self.batch_requests += 1
+            if self.sim.should_fail():
+                failed += 1
+                continue
+            resp = self._answer(req["body"]["messages"])
+            out.append(json.dumps({"custom_id": req["custom_id"], "response": {"status_code": 200, "body": {
+                "model": req["body"]["model"],
+                "choices": [{"message": {"content": resp.choices[0].message.content}}],
+                "usage": vars(resp.usage)
+            }}}, ensure_ascii=False))
+        with self._lock:
+            file_id = f"file-{len(self._files)}"
+            self._files[file_id] = "\n".join(out) + "\n"
+        batch.update(status="completed", output_file_id=file_id,
+                     request_counts={"total": len(lines), "completed": len(lines) - failed, "failed": failed})
+
+    def _error(self):
+        with self._lock:
+            self.errors += 1
+            n = self.errors
+        request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+        if n % 2:
+            raise openai.RateLimitError("simulated 429", response=httpx.Response(429, request=request), body=None)
+        raise openai.InternalServerError("simulated 500", response=httpx.Response(500, request=request), body=None)
+
+    def _create(self, model: str, messages: List[Dict[str, str]], **kw):
+        start = time.monotonic()
+        with self._lock:
+            self.calls += 1
+            self.models[model] = self.models.get(model, 0) + 1
+        self.sim.sleep()
+        if self.sim.should_fail():
+            self._error()
+        resp = self._answer(messages)
+        with self._lock:
+            self.latencies.append(time.monotonic() - start)
+        return resp
+
+    def _answer(self, messages: List[Dict[str, str]]):
+        user = messages[-1]["content"]
+        system = messages[0]["content"]
+        repair = system.startswith(main.REPAIR_PROMPT.split("{", 1)[0])
+        if repair:
+            # 교정 요청: 이전 응답에서 스키마에 안 맞는 필드만 채워 돌려줌
+            try:
+                content = json.loads(user.split("이전 응답:\n", 1)[1])
+            except (IndexError, ValueError):
+                content = {}
+            schema, fix = ((main.SUMMARY_SCHEMA, {"overall_summary": "합성 커밋 요약", "overall_risk": "low"})
+                           if "overall_risk" in system else
+                           (main.FILE_FINDING_SCHEMA, {"summary": "교정된 요약", "risk_level": "low"}))
+            for k, v in fix.items():
+                if main.schema_errors({k: content.get(k)}, {k: schema[k]}):
+                    content[k] = v
+        elif user.startswith("### file_path:"):
+            paths = [l.split(": ", 1)[1] for l in user.split("\n") if l.startswith("### file_path:")]
+            content = {"files": [{"file_path": p, "change_type": "modified", "summary": f"{p} 변경", "risk_level": "low"}
+                                 for p in paths]}
+        elif user.startswith("file_path:"):
+            path = user.split("\n", 1)[0].split(": ", 1)[1]
+            content = {"file_path": path, "change_type": "modified", "summary": f"{path} 변경", "risk_level": "low"}
+        else:
+            content = {"overall_summary": "합성 커밋 요약", "overall_risk": "low"}
+        if not repair and "files" not in content and self.invalid.should_fail():
+            content["overall_risk" if "overall_summary" in content else "risk_level"] = "critical"  # 허용되지 않는 값
+        prompt_tokens = sum(main.estimate_tokens(m["content"]) for m in messages)
+        return _Obj(
+            choices=[_Obj(message=_Obj(content=json.dumps(content, ensure_ascii=False)))],
+            usage=_Obj(prompt_tokens=prompt_tokens, completion_tokens=30, total_tokens=prompt_tokens + 30)
+        )
+
+# ======================================
+# 📏 3. 측정
+# ======================================
+def percentile(values: List[float], p: float) -> float:
+    if not values:
+        return 0.0
+    s = sorted(values)
+    k = min(len(s) - 1, max(0, int(round(p / 100 * (len(s) - 1)))))
+    return s[k]
+
+def _reset_run_state(retry_wait: float):
+    """시나리오 간 전역 상태 초기화"""
+    main.profile = main.RunProfile()
+    if main.dedup_index:
+        main.dedup_index = main.DedupIndex(main.DEDUP_IGNORE_LINE_NUMBERS)
+    for name in dir(main):
+        fn = getattr(main, name)
+        if callable(fn) and hasattr(fn, "retry") and hasattr(fn.retry, "wait"):
+            fn.retry.wait = wait_fixed(retry_wait)
+
+def bench_pipeline(commits: int, files: int, repos: int, args) -> Dict[str, Any]:
+    """main() 전체 파이프라인 (목록 → 파일 분석 → 커밋 요약 → 리포트)"""
+    day = dt.datetime.now(tz=main.KST).date() - dt.timedelta(days=1)
+    fake_gh = FakeGithub(args.gh_latency, args.gh_error_rate, args.seed)
+    fake_oai = FakeOpenAI(args.llm_latency, args.llm_error_rate, args.seed, invalid_rate=args.llm_invalid_rate)
+    names = [f"bench/repo-{i}" for i in range(repos)]
+    for i, name in enumerate(names):
+        fake_gh.repos[name] = FakeRepo(fake_gh, name, day, commits, files, args.patch_lines, args.seed + i)
+    main.gh, main.oai, main.DEFAULT_REPOS = fake_gh, fake_oai, names
+    main.count_github_requests(fake_gh)
+    _reset_run_state(args.retry_wait)
+
+    start = time.monotonic()
+    main.OPENAI_BATCH_POLL_SECONDS = 0.01
+    main.main(["--since", day.isoformat(), "--until", day.isoformat()] + (["--batch"] if args.batch else []))
+    wall = time.monotonic() - start
+
+    prof = main.profile.to_dict()
+    commit_lat = [c["stages"]["commit"]["seconds"] for c in prof["by_commit"].values() if "commit" in c["stages"]]
+    counters = prof["totals"]["counters"]
+    total_commits, total_files = commits * repos, commits * repos * files
+    return {
+        "scenario": f"pipeline{' batch' if args.batch else ''} repos={repos} commits={commits} files={files}",
+        "wall_seconds": round(wall, 3),
+        "commits_per_sec": round(total_commits / wall, 2) if wall else 0,
+        "files_per_sec": round(total_files / wall, 2) if wall else 0,
+        "commit_latency_p50": round(percentile(commit_lat, 50), 4),
+        "commit_latency_p95": round(percentile(commit_lat, 95), 4),
+        "commit_latency_p99": round(percentile(commit_lat, 99), 4),
+        "llm_latency_p50": round(percentile(fake_oai.latencies, 50), 4),
+        "llm_latency_p95": round(percentile(fake_oai.latencies, 95), 4),
+        "openai_requests": fake_oai.calls,
+        "openai_batch_requests": fake_oai.batch_requests,
+        "openai_errors": fake_oai.errors,
+        "openai_retries": int(counters.get("openai_retries", 0)),
+        "openai_requests_by_model": dict(fake_oai.models),
+        "schema_outcomes": {k: int(counters.get(f"schema_{k}", 0)) for k in ("ok", "repaired", "invalid")},
+        "github_requests": sum(fake_gh.calls.values()),
+        "github_requests_by_kind": dict(fake_gh.calls),
+        "github_calls_profiled": int(counters.get("github_calls", 0)),
+        "github_retries": int(counters.get("github_retries", 0)),
+        "prompt_tokens": int(counters.get("prompt_tokens", 0)),
+    }
+
+def bench_summarize(files: int, args) -> Dict[str, Any]:
+    """summarize_commit 청크 분할/통합만 단독 측정"""
+    fake_oai = FakeOpenAI(args.llm_latency, args.llm_error_rate, args.seed, invalid_rate=args.llm_invalid_rate)
+    main.oai = fake_oai
+    _reset_run_state(args.retry_wait)
+    findings = [
+        main.FileFinding(file_path=f"src/pkg_{i // 20}/file_{i}.py", change_type="modified",
+                         summary=f"함수 시그니처 변경 및 호출부 정리 {i}", risk_level=("high" if i % 17 == 0 else "low"))
+        for i in range(files)
+    ]
+    meta = {"repo": "bench/summarize", "sha": "%040x" % files, "title": "bench", "date_kst": "2025-01-01 00:00:00 KST"}
+    start = time.monotonic()
+    main.summarize_commit(findings, meta)
+    wall = time.monotonic() - start
+    return {
+        "scenario": f"summarize_commit files={files}",
+        "wall_seconds": round(wall, 3),
+        "openai_requests": fake_oai.calls,
+        "openai_errors": fake_oai.errors,
+        "llm_latency_p50": round(percentile(fake_oai.latencies, 50), 4),
+        "llm_latency_p95": round(percentile(fake_oai.latencies, 95), 4),
+    }
+
+def _ints(value: str) -> List[int]:
+    return [int(v) for v in value.split(",") if v.strip()]
+
+def main_cli(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="오프라인 벤치마크 (GitHub/OpenAI 대역)")
+    parser.add_argument("--commits", type=_ints, default=[10, 100], help="하루 커밋 수 목록 (예: 10,100,1000)")
+    parser.add_argument("--files", type=_ints, default=[1, 50], help="커밋당 파일 수 목록 (예: 1,50,500)")
+    parser.add_argument("--repos", type=int, default=1, help="리포지토리 수")
+    parser.add_argument("--summarize-files", type=_ints, default=[50, 500, 2000], help="summarize_commit 단독 측정 파일 수")
+    parser.add_argument("--patch-lines", type=int, default=5, help="파일당 변경 라인 수")
+    parser.add_argument("--llm-latency", type=float, default=0.02, help="OpenAI 평균 지연(초)")
+    parser.add_argument("--gh-latency", type=float, default=0.005, help="GitHub 평균 지연(초)")
+    parser.add_argument("--llm-error-rate", type=float, default=0.0, help="OpenAI 429/5xx 비율")
+    parser.add_argument("--llm-invalid-rate", type=float, default=0.0, help="OpenAI 응답 중 스키마에 안 맞는 비율 (교정 요청 측정)")
+    parser.add_argument("--gh-error-rate", type=float, default=0.0, help="GitHub Rate limit 오류 비율")
+    parser.add_argument("--batch", action="store_true", help="파이프라인을 Batch API 모드(대역 배치 엔드포인트)로 실행")
+    parser.add_argument("--retry-wait", type=float, default=0.0, help="벤치마크 중 tenacity 재시도 대기(초)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", help="결과를 JSON 으로 저장할 경로")
+    args = parser.parse_args(argv)
+
+    results = []
+    for commits in args.commits:
+        for files in args.files:
+            results.append(bench_pipeline(commits, files, args.repos, args))
+            print(json.dumps(results[-1], ensure_ascii=False))
+    for files in args.summarize_files:
+        results.append(bench_summarize(files, args))
+        print(json.dumps(results[-1], ensure_ascii=False))
+
+    print()
+    print(f"{'scenario':<48} {'wall(s)':>8} {'commit/s':>9} {'p50':>8} {'p95':>8} {'p99':>8} {'LLM req':>8} {'GH req':>7}")
+    for r in results:
+        print(f"{r['scenario']:<48} {r['wall_seconds']:>8} {r.get('commits_per_sec', '-'):>9} "
+              f"{r.get('commit_latency_p50', r.get('llm_latency_p50')):>8} "
+              f"{r.get('commit_latency_p95', r.get('llm_latency_p95')):>8} "
+              f"{r.get('commit_latency_p99', '-'):>8} {r['openai_requests']:>8} {r.get('github_requests', '-'):>7}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"args": vars(args), "results": results}, f, indent=2, ensure_ascii=False)
+
+if __name__ == "__main__":
+    main_cli()
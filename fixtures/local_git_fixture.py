@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+COMMIT_SOURCE=local 오프라인 점검: 고정 시각으로 작은 git 저장소를 만들고
+LocalGitCommitSource 의 목록/파일 파싱(루트 커밋, rename, 바이너리, 삭제, 비ASCII 경로, 머지)을 확인한다.
+네트워크/토큰 없이 돌며, 어긋나면 AssertionError 로 종료한다.
+
+    python fixtures/local_git_fixture.py          # 점검 (임시 폴더 사용 후 삭제)
+    python fixtures/local_git_fixture.py --keep   # 만든 저장소/미러 경로를 남김
+"""
+
+import os, sys, shutil, argparse, tempfile, subprocess, datetime as dt
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import main
+
+AUTHOR = ("Fixture User", "fixture@example.com")
+DAY = dt.date(2025, 1, 15)
+PNG = bytes(range(256)) * 4  # NUL 포함 → git 이 바이너리로 판단
+
+# ======================================
+# 🏗️ 1. 픽스처 저장소
+# ======================================
+def _run(repo: str, *args: str, when: str = "2025-01-15T10:00:00+09:00"):
+    env = dict(os.environ, GIT_AUTHOR_NAME=AUTHOR[0], GIT_AUTHOR_EMAIL=AUTHOR[1],
+               GIT_COMMITTER_NAME=AUTHOR[0], GIT_COMMITTER_EMAIL=AUTHOR[1],
+               GIT_AUTHOR_DATE=when, GIT_COMMITTER_DATE=when)
+    subprocess.run(["git", "-C", repo, *args], env=env, check=True, capture_output=True)
+
+def _write(repo: str, path: str, data):
+    full = os.path.join(repo, path)
+    os.makedirs(os.path.dirname(full), exist_ok=True)
+    with open(full, "wb") as f:
+        f.write(data if isinstance(data, bytes) else data.encode("utf-8"))
+
+def build(repo: str):
+    """main 브랜치: 루트 커밋 → rename+바이너리+삭제+비ASCII 경로 → feature 머지(--no-ff)"""
+    os.makedirs(repo)
+    _run(repo, "init", "--quiet", "--initial-branch=main")
+    _write(repo, "README.md", "# fixture\n")
+    _write(repo, "src/app.py", "".join(f"def f{i}():\n    return {i}\n\n" for i in range(10)))
+    _write(repo, "assets/logo.png", PNG)
+    _run(repo, "add", "-A")
+    _run(repo, "commit", "--quiet", "-m", "root commit", when="2025-01-15T09:00:00+09:00")
+
+    _run(repo, "mv", "src/app.py", "src/service.py")
+    with open(os.path.join(repo, "src/service.py"), "a", encoding="utf-8") as f:
+        f.write("def extra():\n    return 'x'\n")
+    _write(repo, "assets/logo.png", PNG[::-1])
+    _write(repo, "docs/설명 파일.md", "한글 경로\n")
+    _run(repo, "rm", "--quiet", "README.md")
+    _run(repo, "add", "-A")
+    _run(repo, "commit", "--quiet", "-m", "rename, binary, delete", when="2025-01-15T11:00:00+09:00")
+
+    _run(repo, "checkout", "--quiet", "-b", "feature")
+    _write(repo, "src/feature.py", "FEATURE = True\n")
+    _run(repo, "add", "-A")
+    _run(repo, "commit", "--quiet", "-m", "feature work", when="2025-01-15T12:00:00+09:00")
+    _run(repo, "checkout", "--quiet", "main")
+    _run(repo, "merge", "--quiet", "--no-ff", "-m", "merge feature", "feature", when="2025-01-15T13:00:00+09:00")
+
+# ======================================
+# ✅ 2. 점검
+# ======================================
+def check(workdir: str):
+    origin = os.path.join(workdir, "origin")
+    build(origin)
+    main.BRANCH, main.MY_GITHUB_LOGIN, main.MY_GITHUB_EMAIL = "main", "", AUTHOR[1]
+    source = main.LocalGitCommitSource("fixture/repo", mirror_dir=os.path.join(workdir, "mirrors"), remote_url=origin)
+
+    _, start_utc, end_utc = main.get_kst_day_bounds(DAY)
+    refs = source.list_commits(start_utc, end_utc)
+    titles = [r.title for r in refs]
+    assert titles == ["merge feature", "feature work", "rename, binary, delete", "root commit"], titles
+    by_title = {r.title: r for r in refs}
+
+    root = {f.filename: f for f in source.get_files(by_title["root commit"].sha)}
+    assert sorted(root) == ["README.md", "assets/logo.png", "src/app.py"], sorted(root)
+    assert all(f.status == "added" for f in root.values())
+    assert root["assets/logo.png"].patch is None
+    assert root["src/app.py"].patch.startswith("@@ -0,0 +1,"), root["src/app.py"].patch[:20]
+
+    files = {f.filename: f for f in source.get_files(by_title["rename, binary, delete"].sha)}
+    assert sorted(files) == ["README.md", "assets/logo.png", "docs/설명 파일.md", "src/service.py"], sorted(files)
+    renamed = files["src/service.py"]
+    assert (renamed.status, renamed.previous_filename) == ("renamed", "src/app.py"), vars(renamed)
+    assert "+def extra():" in renamed.patch and "diff --git" not in renamed.patch
+    assert (files["assets/logo.png"].status, files["assets/logo.png"].patch) == ("modified", None)
+    assert files["README.md"].status == "removed" and files["README.md"].patch.startswith("@@ -1 +0,0")
+    assert files["docs/설명 파일.md"].status == "added" and "+한글 경로" in files["docs/설명 파일.md"].patch
+
+    merged = source.get_files(by_title["merge feature"].sha)
+    assert [(f.filename, f.status) for f in merged] == [("src/feature.py", "added")], merged
+    check_token_not_in_argv(workdir)
+    print(f"OK: {len(refs)} commits, root/rename/binary/delete/non-ASCII/merge parsing matches, token kept off argv")
+
+def check_token_not_in_argv(workdir: str):
+    """https 원격 fetch 시 토큰이 명령줄이 아니라 GIT_CONFIG_* 환경변수로만 전달되는지 (실제 전송 없이 인자만 확인)"""
+    seen = []
+    real_run, real_token = main.subprocess.run, main.GITHUB_TOKEN
+    main.subprocess.run = lambda cmd, **kw: seen.append((cmd, kw.get("env") or {})) or subprocess.CompletedProcess(cmd, 0, b"", b"")
+    main.GITHUB_TOKEN = "fixture-token"
+    try:
+        main.LocalGitCommitSource("fixture/repo", mirror_dir=os.path.join(workdir, "mirrors"),
+                                  remote_url="https://example.invalid/fixture/repo.git").sync()
+    finally:
+        main.subprocess.run, main.GITHUB_TOKEN = real_run, real_token
+    (cmd, env), = seen
+    assert not any("Authorization" in a or "extraHeader" in a for a in cmd), cmd
+    n = int(env["GIT_CONFIG_COUNT"]) - 1
+    assert env[f"GIT_CONFIG_KEY_{n}"] == "http.extraHeader" and env[f"GIT_CONFIG_VALUE_{n}"].startswith("Authorization: basic ")
+
+def main_cli(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="LocalGitCommitSource 오프라인 점검")
+    parser.add_argument("--keep", action="store_true", help="임시 저장소/미러를 지우지 않음")
+    args = parser.parse_args(argv)
+    workdir = tempfile.mkdtemp(prefix="git_fixture_")
+    try:
+        check(workdir)
+    finally:
+        if args.keep:
+            print(f"fixture kept at {workdir}")
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
@@ -1,12 +1,15 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-import os, json, textwrap, datetime as dt
-from typing import List, Optional, Dict, Any
+import os, json, time, base64, shutil, fnmatch, logging, argparse, hashlib, contextvars, sqlite3, subprocess, textwrap, threading, collections, datetime as dt
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import List, Optional, Dict, Any, Callable, Tuple
 from dateutil import tz
-from tenacity import retry, wait_random_exponential, stop_after_attempt
-from github import Github
-from openai import OpenAI, BadRequestError
+from tenacity import retry, retry_if_exception_type, wait_random_exponential, stop_after_attempt
+import httpx
+from github import Github, RateLimitExceededException
+from openai import OpenAI, BadRequestError, APIConnectionError, RateLimitError, InternalServerError
 from dotenv import load_dotenv
 
 # ======================================
@@ -27,8 +30,87 @@ BRANCH          = os.getenv("BRANCH", "main")                         # 분석
 OUT_DIR         = os.getenv("OUT_DIR", "./reports")                   # 결과 저장 폴더
 os.makedirs(OUT_DIR, exist_ok=True)
 
-# 대용량 커밋 요약 시 파일을 나누는 단위(권장: 8~15)
-MAX_FILES_PER_CALL = int(os.getenv("MAX_FILES_PER_CALL", "6"))
+# GitHub 수집 설정
+REPO_CONCURRENCY     = int(os.getenv("REPO_CONCURRENCY", "3"))         # 동시에 수집할 리포지토리 수
+GITHUB_MIN_REMAINING = int(os.getenv("GITHUB_MIN_REMAINING", "50"))    # 남은 호출 수가 이보다 적으면 리셋까지 대기
+GITHUB_MAX_RETRIES   = int(os.getenv("GITHUB_MAX_RETRIES", "3"))       # Rate limit 초과 시 재시도 횟수
+
+# 기간/백필 실행 시 동시에 처리할 날짜(KST) 수
+DAY_CONCURRENCY = int(os.getenv("DAY_CONCURRENCY", "2"))
+
+# 커밋 목록 조회 최적화
+AUTHOR_FILTER_SERVER_SIDE = os.getenv("AUTHOR_FILTER_SERVER_SIDE", "1") == "1"  # 목록 조회 시 author= 로 서버에서 필터
+GITHUB_GRAPHQL            = os.getenv("GITHUB_GRAPHQL", "0") == "1"             # GraphQL 로 목록+메타데이터 일괄 조회
+GITHUB_GRAPHQL_URL        = os.getenv("GITHUB_GRAPHQL_URL", "https://api.github.com/graphql")
+
+# 커밋 소스: github (REST/GraphQL) 또는 local (로컬 bare 미러에서 git log/diff)
+COMMIT_SOURCE       = os.getenv("COMMIT_SOURCE", "github")
+MIRROR_DIR          = os.getenv("MIRROR_DIR", "./mirrors")                               # 로컬 미러 저장 폴더
+GIT_REMOTE_TEMPLATE = os.getenv("GIT_REMOTE_TEMPLATE", "https://github.com/{repo}.git")  # 미러 원격 주소
+GIT_FETCH           = os.getenv("GIT_FETCH", "1") == "1"                                 # 0 이면 fetch 생략(오프라인)
+
+# 증분 실행: 기존 리포트(JSONL)에 있는 커밋은 건너뛰고 새 커밋만 분석해 병합 (처리 여부의 기준은 리포트 JSONL)
+INCREMENTAL = os.getenv("INCREMENTAL", "1") == "1"
+STATE_PATH  = os.getenv("STATE_PATH", os.path.join(OUT_DIR, ".state", "state.json"))
+
+# 토큰 예산 (tiktoken 이 설치되어 있으면 실제 토크나이저, 없으면 문자 수 기반 추정)
+MAX_PATCH_TOKENS     = int(os.getenv("MAX_PATCH_TOKENS", "6000"))      # 파일 1개 patch 최대 토큰, 초과분은 hunk 단위로 잘라냄
+SMALL_PATCH_TOKENS   = int(os.getenv("SMALL_PATCH_TOKENS", "300"))     # 이하 크기의 patch 는 여러 개를 한 요청으로 묶음
+FILE_BATCH_TOKENS    = int(os.getenv("FILE_BATCH_TOKENS", "3000"))     # 묶음 요청 1회당 patch 토큰 예산 (0 = 묶지 않음)
+SUMMARY_TOKEN_BUDGET = int(os.getenv("SUMMARY_TOKEN_BUDGET", "4000"))  # 커밋 요약 청크/통합 요청 1개당 입력 토큰 예산
+MERGE_FAN_IN         = max(2, int(os.getenv("MERGE_FAN_IN", "8")))     # 부분 요약 통합 1회에 묶는 최대 개수 (트리 통합)
+
+# LLM 병렬 호출 설정 (0 = 제한 없음)
+LLM_CONCURRENCY = int(os.getenv("LLM_CONCURRENCY", "4"))             # 동시에 진행할 OpenAI 요청 수 (1 = 순차, 0 = 스레드 풀 기본 크기까지)
+OPENAI_RPM      = int(os.getenv("OPENAI_RPM", "0"))                   # 분당 최대 요청 수
+OPENAI_TPM      = int(os.getenv("OPENAI_TPM", "0"))                   # 분당 최대 토큰 수(추정치 기준)
+
+# 모델 라우팅: 작은/저위험 diff 는 저렴한 모델, 크거나 위험 신호가 있는 diff 는 상위 모델 (비우면 OPENAI_MODEL → 라우팅 끔)
+OPENAI_MODEL_SMALL  = os.getenv("OPENAI_MODEL_SMALL", "")                  # 작은 patch, 저위험 요약, 응답 교정(repair) 요청
+OPENAI_MODEL_LARGE  = os.getenv("OPENAI_MODEL_LARGE", "")                  # 큰/잘린 patch, 위험 경로, high 가 섞인 요약
+ROUTE_SMALL_TOKENS  = int(os.getenv("ROUTE_SMALL_TOKENS", "400"))          # patch 가 이 이하면 small
+ROUTE_LARGE_TOKENS  = int(os.getenv("ROUTE_LARGE_TOKENS", "3000"))         # patch 가 이 이상이면 large
+ROUTE_RISKY_GLOBS   = [g.strip().lower() for g in os.getenv(
+    "ROUTE_RISKY_GLOBS", "*migration*,*auth*,*security*,*secret*,*.sql,dockerfile*,*.tf,.github/workflows/*"
+).split(",") if g.strip()]                                                 # 이 경로는 크기와 무관하게 large
+LLM_REPAIR_ATTEMPTS = int(os.getenv("LLM_REPAIR_ATTEMPTS", "1"))           # 응답이 스키마에 안 맞을 때 교정 요청 횟수 (0 = 교정 안 함)
+
+# OpenAI Batch API 모드 (지연에 민감하지 않은 야간 실행용, --batch 로도 켤 수 있음)
+OPENAI_BATCH                = os.getenv("OPENAI_BATCH", "0") == "1"
+OPENAI_BATCH_DIR            = os.getenv("OPENAI_BATCH_DIR", os.path.join(OUT_DIR, ".batch"))  # 배치 요청/결과/상태 저장 폴더
+OPENAI_BATCH_POLL_SECONDS   = float(os.getenv("OPENAI_BATCH_POLL_SECONDS", "30"))            # 상태 확인 간격
+OPENAI_BATCH_MAX_WAIT_HOURS = float(os.getenv("OPENAI_BATCH_MAX_WAIT_HOURS", "24"))          # 초과 시 중단, 다음 실행에서 이어서 폴링
+OPENAI_BATCH_PRICE_FACTOR   = float(os.getenv("OPENAI_BATCH_PRICE_FACTOR", "0.5"))           # 비용 추정 시 단가 배율 (Batch 할인)
+
+# LLM 결과 캐시 (동일 diff 재분석 방지)
+CACHE_ENABLED      = os.getenv("CACHE_ENABLED", "1") == "1"
+CACHE_PATH         = os.getenv("CACHE_PATH", os.path.join(OUT_DIR, ".cache", "llm_cache.sqlite3"))
+CACHE_MAX_AGE_DAYS = float(os.getenv("CACHE_MAX_AGE_DAYS", "30"))    # 이보다 오래된 항목 삭제 (0 = 무제한)
+CACHE_MAX_MB       = float(os.getenv("CACHE_MAX_MB", "200"))          # 초과 시 오래 안 쓴 항목부터 삭제 (0 = 무제한)
+
+# 실행 내 중복 diff 재사용 (머지/체리픽/여러 레포의 같은 vendored·생성 파일)
+DEDUP_ENABLED             = os.getenv("DEDUP_ENABLED", "1") == "1"
+DEDUP_IGNORE_LINE_NUMBERS = os.getenv("DEDUP_IGNORE_LINE_NUMBERS", "1") == "1"  # hunk 헤더의 줄 번호 무시
+
+# 분석 이력 저장소 (날짜별 리포트를 SQLite 에 색인해 기간/경로/위험도 조회, 주간·월간 롤업에 사용)
+ANALYTICS_DB     = os.getenv("ANALYTICS_DB", os.path.join(OUT_DIR, "analytics.sqlite3"))
+ANALYTICS_INGEST = os.getenv("ANALYTICS_INGEST", "1") == "1"   # 리포트 생성 직후 자동 색인
+
+# LLM 전 규칙 기반 파일 분류 (lockfile/압축 번들/스냅샷/생성 코드/이름만 변경/공백만 변경 등은 LLM 없이 요약 또는 제외)
+TRIAGE_RULES_PATH = os.getenv("TRIAGE_RULES_PATH", "triage_rules.json")  # 없으면 내장 기본 규칙 사용
+
+# 로그/프로파일
+LOG_LEVEL     = os.getenv("LOG_LEVEL", "INFO")                                         # DEBUG/INFO/WARNING/ERROR
+PROFILE_PATH  = os.getenv("PROFILE_PATH", os.path.join(OUT_DIR, "run_profile.json"))  # 실행 프로파일 저장 경로
+# 모델별 100만 토큰당 USD (입력, 출력). 예: OPENAI_PRICES='{"gpt-4o-mini": [0.15, 0.6]}'
+OPENAI_PRICES = {
+    "gpt-4o-mini": [0.15, 0.60],
+    "gpt-4o": [2.50, 10.00],
+    "gpt-4.1-nano": [0.10, 0.40],
+    "gpt-4.1-mini": [0.40, 1.60],
+    "gpt-4.1": [2.00, 8.00],
+    **json.loads(os.getenv("OPENAI_PRICES", "{}"))
+}
 
 # --- [B] 토큰 관리 ---
 GITHUB_TOKEN   = os.getenv("GITHUB_TOKEN", "ghp_...")                 # GitHub Personal Access Token
@@ -80,9 +162,33 @@ class CommitFinding:
         self.overall_summary = overall_summary
         self.overall_risk = overall_risk
 
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "repo": self.repo,
+            "sha": self.sha,
+            "author": self.author,
+            "author_login": self.author_login,
+            "author_email": self.author_email,
+            "date_kst": self.date_kst,
+            "title": self.title,
+            "files": [f.to_dict() for f in self.files],
+            "overall_summary": self.overall_summary,
+            "overall_risk": self.overall_risk
+        }
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "CommitFinding":
+        return cls(
+            repo=d["repo"], sha=d["sha"],
+            author=d.get("author"), author_login=d.get("author_login"),
+            author_email=d.get("author_email"), date_kst=d.get("date_kst", ""),
+            title=d.get("title", ""), files=[FileFinding(**f) for f in d.get("files", [])],
+            overall_summary=d.get("overall_summary", ""), overall_risk=d.get("overall_risk", "medium")
+        )
+
 class ReportModel:
     def __init__(self, generated_at: str, model: str, note_date_kst: str, repos: List[str],
-                 branch: str, author_filter: dict, commits: List[CommitFinding]):
+                 branch: str, author_filter: dict, commits: List[CommitFinding], dedup_saved_calls: int = 0):
         self.generated_at = generated_at
         self.model = model
         self.note_date_kst = note_date_kst
@@ -90,6 +196,7 @@ class ReportModel:
         self.branch = branch
         self.author_filter = author_filter
         self.commits = commits
+        self.dedup_saved_calls = dedup_saved_calls  # 이 리포트를 만든 실행들에서 중복 diff 재사용으로 생략한 파일 분석 수 (누적)
 
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -99,73 +206,972 @@ class ReportModel:
             "repos": self.repos,
             "branch": self.branch,
             "author_filter": self.author_filter,
-            "commits": [
-                {
-                    "repo": c.repo,
-                    "sha": c.sha,
-                    "author": c.author,
-                    "author_login": c.author_login,
-                    "author_email": c.author_email,
-                    "date_kst": c.date_kst,
-                    "title": c.title,
-                    "files": [f.to_dict() for f in c.files],
-                    "overall_summary": c.overall_summary,
-                    "overall_risk": c.overall_risk
-                } for c in self.commits
-            ]
+            "dedup_saved_calls": self.dedup_saved_calls,
+            "commits": [c.to_dict() for c in self.commits]
         }
 
 # ======================================
-# ⏰ 3. 날짜 계산 (오늘 날짜 자동)
+# ⏰ 3. 날짜 계산 (기본: 오늘, --since/--until 로 기간 지정)
 # ======================================
-def get_today_kst_bounds():
-    kst = tz.gettz("Asia/Seoul")
-    now_kst = dt.datetime.now(tz=kst)
-    note_date = now_kst.strftime("%Y-%m-%d")
-    start_kst = now_kst.replace(hour=0, minute=0, second=0, microsecond=0)
+KST = tz.gettz("Asia/Seoul")
+
+def get_kst_day_bounds(day: dt.date):
+    """KST 하루 → (YYYY-MM-DD, 시작 UTC, 끝 UTC)"""
+    start_kst = dt.datetime(day.year, day.month, day.day, tzinfo=KST)
     end_kst = start_kst + dt.timedelta(days=1)
-    return note_date, start_kst.astimezone(tz.UTC), end_kst.astimezone(tz.UTC)
+    return day.strftime("%Y-%m-%d"), start_kst.astimezone(tz.UTC), end_kst.astimezone(tz.UTC)
+
+def get_today_kst_bounds():
+    return get_kst_day_bounds(dt.datetime.now(tz=KST).date())
+
+def kst_days(since: dt.date, until: dt.date) -> List[dt.date]:
+    """since ~ until (양끝 포함) KST 날짜 목록"""
+    if until < since:
+        raise ValueError(f"--until ({until}) is before --since ({since})")
+    return [since + dt.timedelta(days=i) for i in range((until - since).days + 1)]
+
+def _as_utc(d: dt.datetime) -> dt.datetime:
+    """PyGithub 날짜(naive UTC 또는 aware)를 aware UTC 로 통일"""
+    return d.replace(tzinfo=tz.UTC) if d.tzinfo is None else d.astimezone(tz.UTC)
+
+_state_lock = threading.Lock()
+
+def load_state() -> Dict[str, Any]:
+    """실행 상태 파일(백필용 완료 날짜) 로드 (없거나 손상 시 빈 상태)"""
+    try:
+        with open(STATE_PATH, "r", encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        state = {}
+    state.setdefault("completed_days", {})
+    return state
+
+def save_state(state: Dict[str, Any]):
+    """상태 파일 원자적 저장 (임시 파일 → rename)"""
+    os.makedirs(os.path.dirname(STATE_PATH) or ".", exist_ok=True)
+    tmp = STATE_PATH + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2, ensure_ascii=False)
+    os.replace(tmp, STATE_PATH)
+
+def is_day_complete(note_date: str, repos: List[str], branch: str) -> bool:
+    """해당 날짜가 지금의 repos/branch 로 오류 없이 끝까지 처리되었는지"""
+    with _state_lock:
+        done = load_state()["completed_days"].get(note_date)
+    return bool(done) and done.get("branch") == branch and set(repos) <= set(done.get("repos", []))
+
+def mark_day_complete(note_date: str, repos: List[str], branch: str):
+    with _state_lock:
+        state = load_state()
+        state["completed_days"][note_date] = {
+            "repos": list(repos),
+            "branch": branch,
+            "finished_at": dt.datetime.now(dt.timezone.utc).isoformat()
+        }
+        save_state(state)
+
+# ======================================
+# 📈 4. 로깅 & 실행 프로파일
+# ======================================
+log = logging.getLogger("research_note")
+
+_profile_scope: contextvars.ContextVar = contextvars.ContextVar("profile_scope", default={})
+
+@contextmanager
+def profile_scope(**scope):
+    """이후 기록되는 시간/호출/토큰을 day, repo, sha, file 단위로도 집계"""
+    token = _profile_scope.set({**_profile_scope.get(), **scope})
+    try:
+        yield
+    finally:
+        _profile_scope.reset(token)
+
+class RunProfile:
+    """실행 프로파일: 단계별 wall time(중첩 포함), HTTP 호출/재시도 수, 토큰, 추정 비용을 전체/레포/커밋/파일별로 집계"""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started_at = dt.datetime.now(dt.timezone.utc)
+        self._t0 = time.monotonic()
+        self.meta: Dict[str, Any] = {}
+        self.totals = self._bucket()
+        self.by_day: Dict[str, Dict[str, Any]] = {}
+        self.by_repo: Dict[str, Dict[str, Any]] = {}
+        self.by_commit: Dict[str, Dict[str, Any]] = {}
+        self.by_file: Dict[str, Dict[str, Any]] = {}
+
+    @staticmethod
+    def _bucket() -> Dict[str, Any]:
+        return {"counters": collections.defaultdict(float), "stages": {}}
+
+    def _buckets(self) -> List[Dict[str, Any]]:
+        scope = _profile_scope.get()
+        buckets = [self.totals]
+        day, repo, sha, path = scope.get("day"), scope.get("repo"), scope.get("sha"), scope.get("file")
+        if day:
+            buckets.append(self.by_day.setdefault(day, self._bucket()))
+        if repo:
+            buckets.append(self.by_repo.setdefault(repo, self._bucket()))
+        if repo and sha:
+            buckets.append(self.by_commit.setdefault(f"{repo}@{sha}", self._bucket()))
+            if path:
+                buckets.append(self.by_file.setdefault(f"{repo}@{sha}:{path}", self._bucket()))
+        return buckets
+
+    def count(self, name: str, n: float = 1):
+        with self._lock:
+            for b in self._buckets():
+                b["counters"][name] += n
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            elapsed = time.monotonic() - start
+            with self._lock:
+                for b in self._buckets():
+                    st = b["stages"].setdefault(name, {"count": 0, "seconds": 0.0})
+                    st["count"] += 1
+                    st["seconds"] += elapsed
+
+    def counter(self, name: str, day: Optional[str] = None, commit: Optional[str] = None) -> float:
+        """누적 카운터 값 (day 지정 시 해당 날짜 분만, commit="repo@sha" 지정 시 해당 커밋 분만)"""
+        with self._lock:
+            if commit:
+                bucket = self.by_commit.get(commit, self._bucket())
+            else:
+                bucket = self.by_day.get(day, self._bucket()) if day else self.totals
+            return bucket["counters"].get(name, 0)
+
+    def add_usage(self, model: str, usage, price_factor: float = 1.0):
+        """OpenAI 응답 usage 필드(객체 또는 Batch 결과의 dict)로 토큰/비용 누적"""
+        if usage is None:
+            return
+        get = usage.get if isinstance(usage, dict) else (lambda k: getattr(usage, k, 0))
+        prompt = get("prompt_tokens") or 0
+        completion = get("completion_tokens") or 0
+        price_in, price_out = OPENAI_PRICES.get(model, [0.0, 0.0])
+        self.count("prompt_tokens", prompt)
+        self.count("completion_tokens", completion)
+        self.count("cost_usd", (prompt * price_in + completion * price_out) * price_factor / 1_000_000)
+
+    @staticmethod
+    def _export(b: Dict[str, Any]) -> Dict[str, Any]:
+        counters = {k: (round(v, 6) if k == "cost_usd" else int(v)) for k, v in sorted(b["counters"].items())}
+        stages = {k: {"count": v["count"], "seconds": round(v["seconds"], 3)} for k, v in sorted(b["stages"].items())}
+        return {"counters": counters, "stages": stages}
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "started_at": self.started_at.isoformat(),
+                "finished_at": dt.datetime.now(dt.timezone.utc).isoformat(),
+                "wall_seconds": round(time.monotonic() - self._t0, 3),
+                **self.meta,
+                "totals": self._export(self.totals),
+                "by_day": {k: self._export(v) for k, v in self.by_day.items()},
+                "by_repo": {k: self._export(v) for k, v in self.by_repo.items()},
+                "by_commit": {k: self._export(v) for k, v in self.by_commit.items()},
+                "by_file": {k: self._export(v) for k, v in self.by_file.items()}
+            }
+
+    def write(self, path: str = PROFILE_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2, ensure_ascii=False)
+
+profile = RunProfile()
+
+def _on_llm_retry(retry_state):
+    """tenacity before_sleep: 재시도 횟수 기록"""
+    profile.count("openai_retries")
+    err = retry_state.outcome.exception() if retry_state.outcome else None
+    name = retry_state.kwargs.get("stage") or retry_state.fn.__name__
+    log.warning(f"[LLM] 🔁 Retrying {name} (attempt {retry_state.attempt_number}): {err}")
+
+# 같은 프롬프트 재전송은 전송/서버 오류(연결·타임아웃, 429, 5xx)에만. 형식이 틀린 응답은 교정 요청으로 처리
+llm_retry = retry(
+    retry=retry_if_exception_type((APIConnectionError, RateLimitError, InternalServerError)),
+    wait=wait_random_exponential(min=1, max=20), stop=stop_after_attempt(4), before_sleep=_on_llm_retry
+)
 
 # ======================================
-# 🤖 4. OpenAI & GitHub 클라이언트
+# 🤖 4-1. OpenAI & GitHub 클라이언트
 # ======================================
 gh = Github(GITHUB_TOKEN, per_page=100)
 oai = OpenAI(api_key=OPENAI_API_KEY)
 
+def count_github_requests(client) -> None:
+    """github_calls 를 HTTP 요청 단위로 집계: PyGithub Requester 의 실제 전송 함수를 감싼다.
+    (목록 순회 시 페이지마다, 리다이렉트·Rate limit 응답도 요청 1회로 셈. 이미 받은 속성 접근은 세지 않음)"""
+    requester = getattr(client, "_Github__requester", None)
+    send = getattr(requester, "_Requester__requestRaw", None)
+    if send is None or getattr(send, "_counted", False):
+        return
+    def counted(*args, **kwargs):
+        profile.count("github_calls")
+        return send(*args, **kwargs)
+    counted._counted = True
+    requester._Requester__requestRaw = counted
+
+count_github_requests(gh)
+
+class RateLimiter:
+    """분당 요청 수(RPM)/토큰 수(TPM) 슬라이딩 윈도우 제한 (스레드 안전)"""
+    def __init__(self, rpm: int = 0, tpm: int = 0, window: float = 60.0):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.window = window
+        self._events = collections.deque()  # (시각, 토큰 수)
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: int = 0):
+        if not self.rpm and not self.tpm:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                while self._events and now - self._events[0][0] >= self.window:
+                    self._events.popleft()
+                used = sum(t for _, t in self._events)
+                req_ok = not self.rpm or len(self._events) < self.rpm
+                # 단일 요청이 TPM 보다 크면 윈도우가 빌 때까지만 기다린다
+                tok_ok = not self.tpm or not self._events or used + tokens <= self.tpm
+                if req_ok and tok_ok:
+                    self._events.append((now, tokens))
+                    return
+                wait = self.window - (now - self._events[0][0])
+            time.sleep(max(wait, 0.05))
+
+_gh_budget_lock = threading.Lock()
+
+def _wait_for_github_budget():
+    """X-RateLimit-Remaining 이 임계치 미만이면 X-RateLimit-Reset 까지 대기 (한 스레드만 대기, 나머지는 잠금에서 대기)"""
+    with _gh_budget_lock:
+        remaining, _ = gh.rate_limiting
+        if remaining < 0 or remaining >= GITHUB_MIN_REMAINING:
+            return
+        wait = gh.rate_limiting_resettime - time.time() + 1
+        if wait > 0:
+            log.info(f"[GITHUB] ⏳ Rate limit low ({remaining} left), sleeping {wait:.0f}s until reset")
+            time.sleep(wait)
+
+def gh_call(fn: Callable, *args, **kwargs):
+    """GitHub API 호출 래퍼: 남은 호출 수 확인 + Rate limit 초과 시 Retry-After/리셋 시각까지 대기 후 재시도.
+    2차(abuse) 제한의 403 + Retry-After 는 PyGithub 기본 GithubRetry 가 먼저 처리한다."""
+    for attempt in range(GITHUB_MAX_RETRIES + 1):
+        _wait_for_github_budget()
+        try:
+            return fn(*args, **kwargs)
+        except RateLimitExceededException as e:
+            if attempt >= GITHUB_MAX_RETRIES:
+                raise
+            profile.count("github_retries")
+            headers = e.headers or {}
+            retry_after = headers.get("retry-after") or headers.get("Retry-After")
+            reset = headers.get("x-ratelimit-reset") or headers.get("X-RateLimit-Reset")
+            if retry_after:
+                wait = float(retry_after)
+            elif reset:
+                wait = float(reset) - time.time() + 1
+            else:
+                wait = 60 * (attempt + 1)
+            log.info(f"[GITHUB] ⏳ Rate limited, retrying in {max(wait, 1):.0f}s ({attempt+1}/{GITHUB_MAX_RETRIES})")
+            time.sleep(max(wait, 1))
+
+def _github_remaining() -> Optional[int]:
+    """GitHub REST 남은 호출 수 (조회 실패 시 None)"""
+    if COMMIT_SOURCE != "github":
+        return None
+    try:
+        return gh.rate_limiting[0]
+    except Exception:
+        return None
+
+llm_limiter = RateLimiter(rpm=OPENAI_RPM, tpm=OPENAI_TPM)
+_llm_slots = threading.BoundedSemaphore(LLM_CONCURRENCY) if LLM_CONCURRENCY > 0 else None
+
+class LLMCache:
+    """LLM 분석 결과 영구 캐시 (SQLite, 입력 내용 해시를 키로 사용)"""
+    def __init__(self, path: str, max_age_days: float = 0, max_mb: float = 0):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.max_age_days = max_age_days
+        self.max_mb = max_mb
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "key TEXT PRIMARY KEY, kind TEXT, value TEXT, created_at REAL, accessed_at REAL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_cache_accessed ON cache(accessed_at)")
+        self._db.commit()
+
+    @staticmethod
+    def make_key(*parts) -> str:
+        raw = json.dumps(parts, ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._db.execute("SELECT value FROM cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                profile.count("cache_misses")
+                return None
+            self.hits += 1
+            profile.count("cache_hits")
+            self._db.execute("UPDATE cache SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            self._db.commit()
+        return json.loads(row[0])
+
+    def put(self, key: str, kind: str, value: Dict[str, Any]):
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO cache (key, kind, value, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, kind, json.dumps(value, ensure_ascii=False), now, now)
+            )
+            self._db.commit()
+
+    def evict(self) -> int:
+        """기간/용량 기준 정리, 삭제된 항목 수 반환"""
+        removed = 0
+        with self._lock:
+            if self.max_age_days > 0:
+                cutoff = time.time() - self.max_age_days * 86400
+                removed += self._db.execute("DELETE FROM cache WHERE accessed_at < ?", (cutoff,)).rowcount
+            if self.max_mb > 0:
+                limit = int(self.max_mb * 1024 * 1024)
+                total = self._db.execute("SELECT COALESCE(SUM(LENGTH(value)), 0) FROM cache").fetchone()[0]
+                rows = self._db.execute("SELECT key, LENGTH(value) FROM cache ORDER BY accessed_at").fetchall()
+                for key, size in rows:
+                    if total <= limit:
+                        break
+                    self._db.execute("DELETE FROM cache WHERE key = ?", (key,))
+                    total -= size
+                    removed += 1
+            self._db.commit()
+        return removed
+
+    def stats(self) -> str:
+        total = self.hits + self.misses
+        rate = (self.hits / total * 100) if total else 0.0
+        return f"hits={self.hits}, misses={self.misses}, hit_rate={rate:.1f}%"
+
+llm_cache = LLMCache(CACHE_PATH, CACHE_MAX_AGE_DAYS, CACHE_MAX_MB) if CACHE_ENABLED else None
+
+class DedupIndex:
+    """실행 내 중복 diff 인덱스: (분석 모델, 정규화한 patch) 해시 → 처음 분석한 FileFinding.
+    patch 는 hunk 만 담고 있어 경로와 무관하고, 같은 diff 가 동시에 분석 중이면 그 결과를 기다린다.
+    경로에 따라 라우팅 모델이 달라지므로 모델이 다르면 같은 diff 라도 따로 분석한다"""
+    def __init__(self, ignore_line_numbers: bool = True):
+        self.ignore_line_numbers = ignore_line_numbers
+        self.saved = 0
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Future] = {}
+
+    def key(self, patch: str, model: str = "") -> str:
+        """공백(들여쓰기/줄 끝/CRLF/빈 줄) 무시, 옵션에 따라 hunk 헤더 줄 번호 무시"""
+        lines = [model]
+        for line in patch.splitlines():
+            if self.ignore_line_numbers and line.startswith("@@"):
+                line = "@@" + line.split("@@", 2)[-1] if line.count("@@") >= 2 else "@@"
+            body = "".join(line[1:].split())
+            if body or line[:1] == "@":
+                lines.append(line[:1] + body)
+        return hashlib.sha256("\n".join(lines).encode("utf-8")).hexdigest()
+
+    def claim(self, key: str) -> Tuple[Future, bool]:
+        """(결과 Future, 내가 분석할 차례인지). 먼저 claim 한 쪽이 resolve 해야 한다"""
+        with self._lock:
+            fut = self._entries.get(key)
+            if fut is not None:
+                return fut, False
+            fut = self._entries[key] = Future()
+            return fut, True
+
+    def resolve(self, key: str, finding: Optional[FileFinding]):
+        """분석 결과 등록. 실패(None/파싱 실패)면 항목을 지워 다음 diff 가 다시 분석하게 함"""
+        with self._lock:
+            fut = self._entries.get(key)
+            if fut is None or fut.done():
+                return
+            if finding is None or finding.summary in _FILE_FAILED_SUMMARIES:
+                del self._entries[key]
+                finding = None
+            fut.set_result(finding)
+
+    def reused(self, finding: FileFinding, file_path: str, change_type: str) -> FileFinding:
+        """먼저 분석된 결과를 이 파일 경로/변경 유형으로 복사"""
+        with self._lock:
+            self.saved += 1
+        profile.count("dedup_saved_calls")
+        return FileFinding(**{**finding.to_dict(), "file_path": file_path, "change_type": change_type})
+
+dedup_index = DedupIndex(DEDUP_IGNORE_LINE_NUMBERS) if DEDUP_ENABLED else None
+
+try:
+    import tiktoken
+    try:
+        _encoding = tiktoken.encoding_for_model(OPENAI_MODEL)
+    except KeyError:
+        _encoding = tiktoken.get_encoding("cl100k_base")
+except Exception:  # 미설치 또는 인코딩 파일 다운로드 불가(오프라인)
+    _encoding = None
+
+def estimate_tokens(text: str) -> int:
+    """토큰 수 계산 (tiktoken 사용, 없으면 영문 ~4자/한글 ~1-2자당 1토큰 → 보수적으로 3자)"""
+    if _encoding is not None:
+        return len(_encoding.encode(text or "", disallowed_special=()))
+    return len(text or "") // 3 + 1
+
+def pack_by_budget(items: List[Any], cost: Callable[[Any], int], budget: int, max_items: int = 0) -> List[List[Any]]:
+    """순서를 유지하며 누적 비용이 budget 이하(max_items 지정 시 개수도 그 이하)가 되도록 묶음 (단일 항목이 예산 초과면 단독 묶음)"""
+    groups: List[List[Any]] = []
+    current: List[Any] = []
+    used = 0
+    for item in items:
+        c = cost(item)
+        if current and (used + c > budget or (max_items and len(current) >= max_items)):
+            groups.append(current)
+            current, used = [], 0
+        current.append(item)
+        used += c
+    if current:
+        groups.append(current)
+    return groups
+
+def trim_patch(patch: str, budget: int = MAX_PATCH_TOKENS) -> str:
+    """patch 가 예산을 넘으면 앞쪽 hunk 부터 예산만큼 남기고, 생략된 hunk/라인 수(+/-)를 한 줄로 요약"""
+    if not patch or budget <= 0 or estimate_tokens(patch) <= budget:
+        return patch
+    hunks: List[List[str]] = []
+    for line in patch.split("\n"):
+        if line.startswith("@@") or not hunks:
+            hunks.append([])
+        hunks[-1].append(line)
+
+    kept: List[str] = []
+    used = 0
+    omitted_hunks = 0
+    omitted_lines: List[str] = []
+    for hunk in hunks:
+        text = "\n".join(hunk)
+        t = estimate_tokens(text)
+        if not omitted_lines and used + t <= budget:
+            kept.append(text)
+            used += t
+            continue
+        if not kept and not omitted_lines:
+            # 첫 hunk 자체가 예산 초과 → 라인 단위로 앞부분만 유지
+            head: List[str] = []
+            for i, line in enumerate(hunk):
+                lt = estimate_tokens(line) + 1
+                if used + lt > budget:
+                    omitted_lines.extend(hunk[i:])
+                    break
+                head.append(line)
+                used += lt
+            kept.append("\n".join(head))
+            omitted_hunks += 1
+            continue
+        omitted_hunks += 1
+        omitted_lines.extend(hunk)
+    adds = sum(1 for l in omitted_lines if l.startswith("+"))
+    dels = sum(1 for l in omitted_lines if l.startswith("-"))
+    note = f"... [truncated: {omitted_hunks} hunk(s), {len(omitted_lines)} lines omitted (+{adds}/-{dels})]"
+    return "\n".join(kept + [note])
+
+def parallel_map(fn: Callable, items: List[Any], max_workers: int) -> List[Any]:
+    """입력 순서를 유지하는 스레드 풀 map (max_workers == 1 이면 순차 실행, 0 이하면 제한 없음 → 스레드 풀 기본 크기)"""
+    items = list(items)
+    if max_workers == 1 or len(items) <= 1:
+        return [fn(x) for x in items]
+    # 워커 스레드에서도 프로파일 범위(contextvars)가 이어지도록 항목마다 컨텍스트 복사
+    contexts = [contextvars.copy_context() for _ in items]
+    workers = min(max_workers, len(items)) if max_workers > 1 else None
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        return list(ex.map(lambda pair: pair[0].run(fn, pair[1]), zip(contexts, items)))
+
 SYSTEM_PROMPT = (
     "당신은 코드 리뷰어입니다. 파일 변경사항을 분석하고 간단한 요약을 제공하세요. "
     "JSON 형식으로 응답하되: file_path, change_type, summary (최대 30단어), risk_level (low/medium/high). "
     "한글로 간결하게 핵심 변경사항만 설명하세요."
 )
+BATCH_SYSTEM_PROMPT = (
+    "당신은 코드 리뷰어입니다. 여러 파일의 변경사항이 주어집니다. 파일마다 간단한 요약을 제공하세요. "
+    "JSON 형식으로 {\"files\": [...]} 를 응답하되 입력과 같은 순서로 각 항목에 "
+    "file_path, change_type, summary (최대 30단어), risk_level (low/medium/high) 를 포함하세요. "
+    "한글로 간결하게 핵심 변경사항만 설명하세요."
+)
+COMMIT_CHUNK_PROMPT = "아래 파일 변경 요약을 바탕으로 커밋의 의도/영향을 5줄 내로 JSON으로 반환(overall_summary, overall_risk: low/medium/high)."
+REPAIR_PROMPT = (
+    "이전 응답이 요구한 JSON 형식에 맞지 않습니다. 내용은 그대로 두고 오류만 고쳐 JSON 객체 하나로만 다시 반환하세요. "
+    "필드: {fields}"
+)
+REPAIR_MAX_CHARS = 6000  # 교정 요청에 다시 보내는 이전 응답 최대 길이
+COMMIT_MERGE_PROMPT = (
+    "부분 요약들([risk=...] 표시 포함)을 통합해 최종 overall_summary(6~10문장)와 overall_risk(low/medium/high)만 JSON으로 반환. "
+    "overall_risk 는 부분 요약 중 가장 높은 위험도보다 낮게 잡지 마세요."
+)
+
+# ======================================
+# 🧹 4-2. 파일 분류 (LLM 전 규칙 기반 triage)
+# ======================================
+# 위에서부터 처음 맞는 규칙 적용. triage_rules.template.json 과 같은 내용
+DEFAULT_TRIAGE_RULES: List[Dict[str, Any]] = [
+    {"name": "readme", "action": "exclude", "glob": ["*readme*"]},
+    {"name": "lockfile", "glob": ["package-lock.json", "npm-shrinkwrap.json", "yarn.lock", "pnpm-lock.yaml", "bun.lockb",
+                                  "poetry.lock", "Pipfile.lock", "uv.lock", "Cargo.lock", "go.sum", "composer.lock",
+                                  "Gemfile.lock", "gradle.lockfile", "packages.lock.json"],
+     "summary": "의존성 잠금 파일 갱신 (+{added}/-{deleted})", "risk_level": "low"},
+    {"name": "minified", "glob": ["*.min.js", "*.min.css", "*.min.mjs", "*.js.map", "*.css.map", "*.bundle.js"],
+     "summary": "빌드 산출물(압축 번들/소스맵) 갱신 (+{added}/-{deleted})", "risk_level": "low"},
+    {"name": "snapshot", "glob": ["*.snap", "*/__snapshots__/*"],
+     "summary": "테스트 스냅샷 갱신 (+{added}/-{deleted})", "risk_level": "low"},
+    {"name": "generated_protobuf", "glob": ["*_pb2.py", "*_pb2.pyi", "*_pb2_grpc.py", "*.pb.go", "*_grpc.pb.go",
+                                            "*_pb.js", "*_pb.d.ts", "*_grpc_pb.js", "*.pb.cc", "*.pb.h"],
+     "summary": "protobuf 생성 코드 갱신 (+{added}/-{deleted})", "risk_level": "low"},
+    {"name": "rename_only", "status": ["renamed"], "max_changes": 0,
+     "summary": "파일 이름 변경: {previous_filename} → {file_path} (내용 변경 없음)", "risk_level": "low"},
+    {"name": "whitespace_only", "whitespace_only": True,
+     "summary": "공백/줄바꿈만 변경 (+{added}/-{deleted})", "risk_level": "low"}
+]
+
+def _diff_stats(f) -> Dict[str, Any]:
+    """ChangedFile → 규칙 판정용 정보 (추가/삭제 줄 수와 공백만 바뀌었는지는 patch 에서 계산)"""
+    patch = getattr(f, "patch", None) or ""
+    added, deleted = [], []
+    for line in patch.splitlines():
+        if line.startswith("+"):
+            added.append(line[1:])
+        elif line.startswith("-"):
+            deleted.append(line[1:])
+    # 줄 앞 들여쓰기는 그대로 둔다: Python/YAML/Makefile 처럼 들여쓰기가 의미인 파일에서
+    # 블록 밖으로 뺀 줄을 "공백만 변경"으로 보면 안 되기 때문. 줄 안/줄 끝 공백과 빈 줄만 무시
+    squash = lambda lines: [l[:len(l) - len(l.lstrip())] + "".join(l.split()) for l in lines if l.strip()]
+    return {
+        "file_path": f.filename,
+        "previous_filename": getattr(f, "previous_filename", None) or f.filename,
+        "status": f.status,
+        "added": len(added),
+        "deleted": len(deleted),
+        "whitespace_only": bool(added or deleted) and squash(added) == squash(deleted)
+    }
+
+class TriageRule:
+    """분류 규칙 1개: 지정한 조건이 모두 맞으면 action 적용.
+    action=summarize 는 summary/risk_level 로 FileFinding 을 바로 만들고, exclude 는 분석 대상에서 뺀다"""
+    def __init__(self, name: str, action: str = "summarize", glob: List[str] = None, status: List[str] = None,
+                 whitespace_only: Optional[bool] = None, min_changes: Optional[int] = None,
+                 max_changes: Optional[int] = None, summary: str = "{name} (+{added}/-{deleted})",
+                 risk_level: str = "low"):
+        if action not in ("summarize", "exclude"):
+            raise ValueError(f"unknown triage action: {action}")
+        self.name = name
+        self.action = action
+        self.glob = [g.lower() for g in (glob or [])]
+        self.status = status
+        self.whitespace_only = whitespace_only
+        self.min_changes = min_changes
+        self.max_changes = max_changes
+        self.summary = summary
+        self.risk_level = risk_level
+
+    def matches(self, stats: Dict[str, Any]) -> bool:
+        path = stats["file_path"].lower()
+        if self.glob and not any(fnmatch.fnmatch(path, g) or fnmatch.fnmatch(os.path.basename(path), g) for g in self.glob):
+            return False
+        if self.status and stats["status"] not in self.status:
+            return False
+        if self.whitespace_only is not None and stats["whitespace_only"] != self.whitespace_only:
+            return False
+        changes = stats["added"] + stats["deleted"]
+        if self.min_changes is not None and changes < self.min_changes:
+            return False
+        if self.max_changes is not None and changes > self.max_changes:
+            return False
+        return True
+
+    def finding(self, stats: Dict[str, Any]) -> FileFinding:
+        return FileFinding(file_path=stats["file_path"], change_type=stats["status"],
+                           summary=self.summary.format(name=self.name, **stats), risk_level=self.risk_level)
+
+def load_triage_rules(path: str) -> List[TriageRule]:
+    """규칙 파일({"rules": [...]}) 로드, 파일이 없으면 기본 규칙"""
+    raw = DEFAULT_TRIAGE_RULES
+    if path and os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            raw = json.load(f).get("rules", [])
+    try:
+        return [TriageRule(**r) for r in raw]
+    except (TypeError, ValueError) as e:
+        raise RuntimeError(f"❌ 파일 분류 규칙이 올바르지 않습니다 ({path}): {e}")
+
+triage_rules = load_triage_rules(TRIAGE_RULES_PATH)
+
+def triage_file(f) -> Tuple[str, Optional[FileFinding]]:
+    """("llm", None) | ("exclude", None) | ("summarize", 규칙으로 만든 FileFinding)"""
+    if not triage_rules:
+        return "llm", None
+    stats = _diff_stats(f)
+    for rule in triage_rules:
+        if rule.matches(stats):
+            log.debug(f"[TRIAGE] 🧹 {f.filename}: {rule.name} → {rule.action}")
+            return rule.action, (rule.finding(stats) if rule.action == "summarize" else None)
+    return "llm", None
+
+# ======================================
+# 🧭 4-3. 모델 라우팅 & 응답 스키마 검증
+# ======================================
+MODEL_TIERS = {
+    "small": OPENAI_MODEL_SMALL or OPENAI_MODEL,
+    "default": OPENAI_MODEL,
+    "large": OPENAI_MODEL_LARGE or OPENAI_MODEL
+}
+ROUTING_ENABLED = len(set(MODEL_TIERS.values())) > 1
+_TIER_ORDER = ["small", "default", "large"]
+_TRUNCATED_NOTE = "\n... [truncated: "  # trim_patch 가 붙이는 생략 표시
+
+def _is_risky_path(file_path: str) -> bool:
+    path = file_path.lower()
+    return any(fnmatch.fnmatch(path, g) or fnmatch.fnmatch(os.path.basename(path), g) for g in ROUTE_RISKY_GLOBS)
+
+def route_file(file_path: str, patch: str) -> str:
+    """파일 분석 모델 등급: 위험 경로/큰 patch/잘린 patch → large, 작은 patch → small, 나머지 default"""
+    if not ROUTING_ENABLED:
+        return "default"
+    tokens = estimate_tokens(patch)
+    if _is_risky_path(file_path) or tokens >= ROUTE_LARGE_TOKENS or _TRUNCATED_NOTE in (patch or ""):
+        return "large"
+    return "small" if tokens <= ROUTE_SMALL_TOKENS else "default"
+
+def route_summary(risks: List[str]) -> str:
+    """커밋 요약/통합 모델 등급: 입력에 high 가 있으면 large, 전부 low 면 small"""
+    if not ROUTING_ENABLED:
+        return "default"
+    if "high" in risks:
+        return "large"
+    return "small" if risks and all(r == "low" for r in risks) else "default"
+
+def _routing_key() -> Any:
+    """캐시 키에 넣을 모델 구성 (라우팅을 끄면 예전 키와 동일)"""
+    return [MODEL_TIERS[t] for t in _TIER_ORDER] if ROUTING_ENABLED else OPENAI_MODEL
+
+_RISK_LEVELS = ("low", "medium", "high")
+# 필드 → (타입 | 허용 값 tuple | [원소 타입], 필수 여부)
+FILE_FINDING_SCHEMA: Dict[str, Tuple[Any, bool]] = {
+    "file_path": (str, False),
+    "change_type": (str, False),
+    "summary": (str, True),
+    "risk_level": (_RISK_LEVELS, True),
+    "breaking_changes": ([str], False),
+    "test_impact": ([str], False),
+    "migration_notes": ([str], False),
+    "owner_guess": (str, False)
+}
+SUMMARY_SCHEMA: Dict[str, Tuple[Any, bool]] = {
+    "overall_summary": (str, True),
+    "overall_risk": (_RISK_LEVELS, True)
+}
+
+def schema_errors(data: Any, schema: Dict[str, Tuple[Any, bool]]) -> List[str]:
+    """스키마 위반 목록 (없으면 빈 목록). 선택 필드의 null 은 허용"""
+    if not isinstance(data, dict):
+        return ["response must be a JSON object"]
+    errors = []
+    for field, (kind, required) in schema.items():
+        value = data.get(field)
+        if value is None:
+            if required:
+                errors.append(f"{field}: required")
+        elif isinstance(kind, tuple):
+            if value not in kind:
+                errors.append(f"{field}: must be one of {'/'.join(kind)}")
+        elif isinstance(kind, list):
+            if not isinstance(value, list) or not all(isinstance(v, kind[0]) for v in value):
+                errors.append(f"{field}: must be a list of strings")
+        elif not isinstance(value, kind) or (required and not value.strip()):
+            errors.append(f"{field}: must be a non-empty string" if required else f"{field}: must be a string")
+    return errors
+
+def _load_checked(out: str, schema: Dict[str, Tuple[Any, bool]]) -> Tuple[Optional[Dict[str, Any]], List[str]]:
+    try:
+        data = json.loads(out)
+    except (TypeError, ValueError) as e:
+        return None, [f"invalid JSON: {e}"]
+    if isinstance(data, dict):
+        for field, (kind, _) in schema.items():
+            if isinstance(kind, tuple) and isinstance(data.get(field), str):
+                data[field] = data[field].strip().lower()  # "High" 같은 대소문자 차이는 교정 없이 허용
+    return data, schema_errors(data, schema)
+
+def _repair_messages(out: str, errors: List[str], schema: Dict[str, Tuple[Any, bool]]) -> List[Dict[str, str]]:
+    fields = ", ".join(
+        f"{field}({'필수' if required else '선택'}: "
+        f"{'/'.join(kind) if isinstance(kind, tuple) else '문자열 목록' if isinstance(kind, list) else '문자열'})"
+        for field, (kind, required) in schema.items()
+    )
+    return [
+        {"role": "system", "content": REPAIR_PROMPT.format(fields=fields)},
+        {"role": "user", "content": "오류:\n- " + "\n- ".join(errors) + "\n\n이전 응답:\n" + (out or "")[:REPAIR_MAX_CHARS]}
+    ]
+
+def checked_json(out: str, schema: Dict[str, Tuple[Any, bool]], stage: str) -> Optional[Dict[str, Any]]:
+    """응답을 스키마로 검증. 틀리면 원래 프롬프트 대신 응답과 오류만 보내는 교정 요청(small 모델)을
+    LLM_REPAIR_ATTEMPTS 번까지 보냄. 결과는 schema_ok/schema_repaired/schema_invalid 카운터로 기록, 끝내 실패하면 None"""
+    data, errors = _load_checked(out, schema)
+    attempt = 0
+    while errors and attempt < LLM_REPAIR_ATTEMPTS:
+        attempt += 1
+        log.info(f"[LLM] 🩹 {stage} response failed schema ({'; '.join(errors)}), repair {attempt}/{LLM_REPAIR_ATTEMPTS}")
+        out = _chat(stage="repair", messages=_repair_messages(out, errors, schema), tier="small")
+        data, errors = _load_checked(out, schema)
+    outcome = "invalid" if errors else "repaired" if attempt else "ok"
+    profile.count(f"schema_{outcome}")
+    if errors:
+        log.warning(f"[LLM] ⚠️ {stage} response still invalid after {attempt} repair(s): {'; '.join(errors)}")
+        return None
+    return data
 
 # ======================================
 # 🧠 5. LLM 호출
 # ======================================
-@retry(wait=wait_random_exponential(min=1, max=20), stop=stop_after_attempt(4))
+@llm_retry
+def _chat(messages: List[Dict[str, str]], stage: str = "chat", tier: str = "default") -> str:
+    """동시성/속도 제한을 거쳐 JSON 응답 Chat Completions 호출 (대기 시간/호출/토큰은 프로파일에 기록).
+    모델은 라우팅 등급(small/default/large)으로 고름"""
+    model = MODEL_TIERS[tier]
+    tokens = sum(estimate_tokens(m["content"]) for m in messages)
+    with profile.stage("openai.wait"):
+        if _llm_slots:
+            _llm_slots.acquire()
+    try:
+        with profile.stage("openai.wait"):
+            llm_limiter.acquire(tokens)
+        with profile.stage(f"openai.{stage}"):
+            profile.count("openai_calls")
+            if ROUTING_ENABLED:
+                profile.count(f"route_{tier}")
+            resp = oai.chat.completions.create(
+                model=model,
+                response_format={"type":"json_object"},
+                messages=messages
+            )
+    finally:
+        if _llm_slots:
+            _llm_slots.release()
+    profile.add_usage(model, getattr(resp, "usage", None))
+    return resp.choices[0].message.content
+
+def _file_cache_key(file_path: str, change_type: str, patch: str) -> str:
+    model = MODEL_TIERS[route_file(file_path, patch)]
+    return LLMCache.make_key("file", model, SYSTEM_PROMPT, file_path, change_type, patch)
+
+# 파일 분석 실패 표시 (캐시/중복 재사용하지 않고, 이것뿐인 커밋은 완료로 보지 않음)
+_FILE_PARSE_FAILED = "LLM parsing failed"
+_FILE_REQUEST_REJECTED = "LLM request rejected"
+_FILE_FAILED_SUMMARIES = {_FILE_PARSE_FAILED, _FILE_REQUEST_REJECTED}
+
+def _cache_file_finding(key: str, finding: FileFinding):
+    if llm_cache and finding.summary not in _FILE_FAILED_SUMMARIES:
+        llm_cache.put(key, "file", finding.to_dict())
+
 def analyze_file(file_path: str, change_type: str, patch: str) -> FileFinding:
-    """파일 단위 요약 (성공적으로 동작 중)"""
-    resp = oai.chat.completions.create(
-        model=OPENAI_MODEL,
-        response_format={"type":"json_object"},
-        messages=[
-            {"role":"system", "content": SYSTEM_PROMPT},
-            {"role":"user", "content": f"file_path: {file_path}\nchange_type: {change_type}\n\nDIFF:\n{patch or ''}"}
-        ]
-    ).choices[0].message.content
+    """파일 1개 요약: 파이프라인과 같은 경로(patch 예산 → 캐시 → 중복 diff 재사용 → LLM)를 거친다"""
+    return analyze_files([(file_path, change_type, trim_patch(patch))])[0]
+
+def _analyze_files_batch_llm(items: List[Tuple[str, str, str]], tier: str = "default") -> List[Optional[FileFinding]]:
+    """작은 파일 여러 개를 한 요청으로 요약. 응답에서 찾지 못했거나 스키마에 맞지 않는 파일은 None (개별 요청으로 재시도)"""
+    body = "\n\n".join(
+        f"### file_path: {path}\nchange_type: {change_type}\n\nDIFF:\n{patch}"
+        for path, change_type, patch in items
+    )
     try:
-        data = json.loads(resp)
-        return FileFinding(
-            file_path=data.get("file_path", file_path),
-            change_type=data.get("change_type", change_type),
-            summary=data.get("summary", "LLM parsing failed"),
-            risk_level=data.get("risk_level", "medium"),
+        resp = _chat(stage="analyze_batch", tier=tier, messages=[
+            {"role":"system", "content": BATCH_SYSTEM_PROMPT},
+            {"role":"user", "content": body}
+        ])
+    except BadRequestError as e:
+        log.warning(f"[FILE] ⚠️  Batched request rejected, retrying files individually: {getattr(e, 'message', e)}")
+        return [None] * len(items)
+    try:
+        entries = json.loads(resp).get("files", [])
+    except Exception:
+        return [None] * len(items)
+    by_path = {e.get("file_path"): e for e in entries if isinstance(e, dict)}
+    results: List[Optional[FileFinding]] = []
+    for i, (path, change_type, _) in enumerate(items):
+        data = by_path.get(path)
+        if data is None and len(entries) == len(items) and isinstance(entries[i], dict):
+            data = entries[i]  # 경로가 바뀌어 돌아오면 순서로 대응
+        if isinstance(data, dict) and isinstance(data.get("risk_level"), str):
+            data["risk_level"] = data["risk_level"].strip().lower()
+        if schema_errors(data, FILE_FINDING_SCHEMA):
+            results.append(None)
+            continue
+        results.append(FileFinding(
+            file_path=path,
+            change_type=data.get("change_type") or change_type,
+            summary=data["summary"],
+            risk_level=data["risk_level"],
             breaking_changes=data.get("breaking_changes", []),
             test_impact=data.get("test_impact", []),
             migration_notes=data.get("migration_notes", []),
             owner_guess=data.get("owner_guess")
-        )
-    except Exception:
-        return FileFinding(file_path=file_path, change_type=change_type, summary="LLM parsing failed", risk_level="medium")
+        ))
+    return results
+
+def analyze_files(items: List[Tuple[str, str, str]]) -> List[FileFinding]:
+    """(file_path, change_type, patch) 목록 요약. 작은 patch 는 FILE_BATCH_TOKENS 예산 안에서 한 요청으로 묶고,
+    묶음 응답에서 빠진 파일은 단일 요청으로 재시도. 결과는 입력 순서 유지"""
+    results: List[Optional[FileFinding]] = [None] * len(items)
+    keys = [_file_cache_key(*it) for it in items]
+    pending: List[int] = []
+    for i, key in enumerate(keys):
+        cached = llm_cache.get(key) if llm_cache else None
+        if cached is not None:
+            results[i] = FileFinding(**cached)
+        else:
+            pending.append(i)
+
+    # 같은 실행에서 이미 분석했거나 분석 중인 diff 는 그 결과를 재사용
+    owned: Dict[int, str] = {}
+    waiting: List[Tuple[int, Future]] = []
+    if dedup_index:
+        for i in pending:
+            path, _, patch = items[i]
+            key = dedup_index.key(patch, MODEL_TIERS[route_file(path, patch)])
+            fut, mine = dedup_index.claim(key)
+            if mine:
+                owned[i] = key
+            else:
+                waiting.append((i, fut))
+        pending = list(owned)
+
+    # 묶음은 같은 모델 등급끼리만 (위험 경로 등 large 로 가는 파일은 단독 요청)
+    tiers = {i: route_file(items[i][0], items[i][2]) for i in pending}
+    small = [i for i in pending if FILE_BATCH_TOKENS > 0 and tiers[i] != "large"
+             and estimate_tokens(items[i][2]) <= SMALL_PATCH_TOKENS]
+    jobs: List[List[int]] = [[i] for i in pending if i not in set(small)]
+    for tier in _TIER_ORDER:
+        jobs += pack_by_budget([i for i in small if tiers[i] == tier], lambda i: estimate_tokens(items[i][2]), FILE_BATCH_TOKENS)
+
+    def run(job: List[int]) -> List[Tuple[int, FileFinding]]:
+        if len(job) == 1:
+            with profile_scope(file=items[job[0]][0]), profile.stage("analyze_file"):
+                finding = _analyze_file_llm(*items[job[0]])
+            _cache_file_finding(keys[job[0]], finding)
+            return [(job[0], finding)]
+        with profile.stage("analyze_batch"):
+            batch = _analyze_files_batch_llm([items[i] for i in job], tiers[job[0]])
+        done = [(i, f) for i, f in zip(job, batch) if f is not None]
+        missing = [i for i, f in zip(job, batch) if f is None]
+        log.info(f"[FILE] 📦 Batched {len(job)} small files in one request ({len(missing)} retried individually)")
+        for i in missing:
+            with profile_scope(file=items[i][0]), profile.stage("analyze_file"):
+                done.append((i, _analyze_file_llm(*items[i])))
+        for i, f in done:
+            _cache_file_finding(keys[i], f)
+        return done
+
+    try:
+        for done in parallel_map(run, jobs, LLM_CONCURRENCY):
+            for i, f in done:
+                results[i] = f
+    finally:
+        # 기다리는 쪽이 멈추지 않도록 실패해도 항상 resolve (내 결과를 먼저 등록한 뒤에 남의 결과를 기다림 → 교착 없음)
+        for i, key in owned.items():
+            dedup_index.resolve(key, results[i])
+
+    for i, fut in waiting:
+        path, change_type, patch = items[i]
+        first = fut.result()
+        if first is None:
+            [(_, finding)] = run([i])
+        else:
+            with profile_scope(file=path):
+                finding = dedup_index.reused(first, path, change_type)
+            _cache_file_finding(keys[i], finding)
+            log.info(f"[FILE] ♻️  Reused analysis of identical diff for {path} (from {first.file_path})")
+        results[i] = finding
+    return results  # type: ignore
+
+def _file_messages(file_path: str, change_type: str, patch: str) -> List[Dict[str, str]]:
+    return [
+        {"role":"system", "content": SYSTEM_PROMPT},
+        {"role":"user", "content": f"file_path: {file_path}\nchange_type: {change_type}\n\nDIFF:\n{patch or ''}"}
+    ]
+
+def _analyze_file_llm(file_path: str, change_type: str, patch: str) -> FileFinding:
+    """파일 단위 요약 LLM 호출 (patch 크기/경로로 모델 선택).
+    요청 자체가 거부되면(400, 컨텍스트 초과 등) 이 파일만 실패 표시로 두고 나머지 파일 결과는 살림"""
+    try:
+        resp = _chat(stage="analyze_file", tier=route_file(file_path, patch),
+                     messages=_file_messages(file_path, change_type, patch))
+    except BadRequestError as e:
+        log.error(f"[FILE] ❌ BadRequest on {file_path}: {getattr(e, 'message', e)}")
+        return FileFinding(file_path=file_path, change_type=change_type, summary=_FILE_REQUEST_REJECTED, risk_level="medium")
+    return _parse_file_finding(resp, file_path, change_type)
+
+def _parse_file_finding(resp: str, file_path: str, change_type: str) -> FileFinding:
+    """스키마 검증(+교정) 후 FileFinding. 교정해도 안 되면 파싱 실패 표시 (캐시/중복 재사용 안 함)"""
+    data = checked_json(resp, FILE_FINDING_SCHEMA, "analyze_file")
+    if data is None:
+        return FileFinding(file_path=file_path, change_type=change_type, summary=_FILE_PARSE_FAILED, risk_level="medium")
+    return FileFinding(
+        file_path=data.get("file_path") or file_path,
+        change_type=data.get("change_type") or change_type,
+        summary=data["summary"],
+        risk_level=data["risk_level"],
+        breaking_changes=data.get("breaking_changes") or [],
+        test_impact=data.get("test_impact") or [],
+        migration_notes=data.get("migration_notes") or [],
+        owner_guess=data.get("owner_guess")
+    )
+
+def _llm_inputs(files: List[Any], triaged: List[Optional[FileFinding]]
+                ) -> Tuple[List[Optional[FileFinding]], List[Tuple[str, str, str]], List[int]]:
+    """분류 규칙/patch 없음으로 결정된 결과와, LLM 에 보낼 (file_path, change_type, 예산 내 patch) 및 그 위치"""
+    results: List[Optional[FileFinding]] = list(triaged)
+    llm_items: List[Tuple[str, str, str]] = []
+    llm_index: List[int] = []
+    for j, f in enumerate(files):
+        if results[j] is not None:
+            profile.count("triage_skipped_calls")
+            continue
+        log.debug(f"[FILE] 🔍 Analyzing file {j+1}/{len(files)}: {f.filename} ({f.status})")
+        patch = getattr(f, "patch", None)
+        if not patch:
+            log.warning(f"[FILE] ⚠️  No patch available for {f.filename} (binary or no diff)")
+            results[j] = FileFinding(file_path=f.filename, change_type=f.status, summary="Binary or no diff", risk_level="medium")
+            continue
+        budgeted = trim_patch(patch)
+        if budgeted is not patch:
+            log.info(f"[FILE] ✂️  Patch for {f.filename} trimmed to ~{MAX_PATCH_TOKENS} tokens")
+        llm_items.append((f.filename, f.status, budgeted))
+        llm_index.append(j)
+    return results, llm_items, llm_index
+
+def analyze_changed_files(files: List[Any], triaged: List[Optional[FileFinding]] = None) -> List[FileFinding]:
+    """변경 파일(ChangedFile) 목록 분석: 분류 규칙으로 요약된 파일과 patch 없는 파일은 LLM 생략,
+    큰 patch 는 토큰 예산으로 자르고, 작은 patch 는 묶어서 요청"""
+    if triaged is None:
+        triaged = [triage_file(f)[1] for f in files]
+    results, llm_items, llm_index = _llm_inputs(files, triaged)
+    if llm_items:
+        log.info(f"[FILE] 🤖 Sending {len(llm_items)} files to LLM for analysis...")
+        for j, finding in zip(llm_index, analyze_files(llm_items)):
+            results[j] = finding
+        log.info(f"[FILE] ✅ LLM analysis completed for {len(llm_items)} files")
+    return results  # type: ignore
+
+_CHUNK_PARSE_FAILED = "(부분 요약 파싱 실패)"
+_MERGE_PARSE_FAILED = "(최종 통합 요약 파싱 실패)"
+_PARSE_FAILED_SUMMARIES = {_CHUNK_PARSE_FAILED, _MERGE_PARSE_FAILED}
 
 def _lighten_files(files: List[FileFinding]) -> List[Dict[str, Any]]:
     """커밋 요약 입력을 슬림화 (필요 필드만 포함)"""
@@ -179,44 +1185,77 @@ def _lighten_files(files: List[FileFinding]) -> List[Dict[str, Any]]:
         for f in files
     ]
 
-@retry(wait=wait_random_exponential(min=1, max=20), stop=stop_after_attempt(4))
+def _chunk_messages(meta: dict, light_files_chunk: List[Dict[str, Any]]) -> List[Dict[str, str]]:
+    return [
+        {"role":"system","content": COMMIT_CHUNK_PROMPT},
+        {"role":"user","content": json.dumps({"meta": {
+            "repo": meta.get("repo",""),
+            "sha": meta.get("sha",""),
+            "title": meta.get("title","")
+        }, "files": light_files_chunk}, ensure_ascii=False)}
+    ]
+
+def _partial_text(partial: Dict[str, Any]) -> str:
+    """통합 입력 1개: 부분 요약의 위험도를 함께 넘겨 여러 단계를 거쳐도 유지되게 함"""
+    return f"[risk={partial.get('overall_risk','medium')}] {partial.get('overall_summary','')}"
+
+def _merge_messages(partials: List[Dict[str, Any]]) -> List[Dict[str, str]]:
+    return [
+        {"role":"system","content": COMMIT_MERGE_PROMPT},
+        {"role":"user","content": "\n\n".join(_partial_text(p) for p in partials)}
+    ]
+
+def _merge_groups(partials: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+    """통합 한 단계의 묶음: MERGE_FAN_IN 개 이하이면서 SUMMARY_TOKEN_BUDGET 이하.
+    부분 요약이 하나하나 예산을 넘어 줄어들지 않으면 개수 기준으로만 묶음"""
+    groups = pack_by_budget(partials, lambda p: estimate_tokens(_partial_text(p)), SUMMARY_TOKEN_BUDGET, MERGE_FAN_IN)
+    if len(groups) == len(partials):
+        groups = [partials[i:i + MERGE_FAN_IN] for i in range(0, len(partials), MERGE_FAN_IN)]
+    return groups
+
+def _parse_summary(out: str, failed: str, stage: str = "summarize_chunk") -> Dict[str, Any]:
+    data = checked_json(out, SUMMARY_SCHEMA, stage)
+    if data is None:
+        return {"overall_summary": failed,"overall_risk":"medium"}
+    return data
+
+def _chunk_tier(light_files_chunk: List[Dict[str, Any]]) -> str:
+    return route_summary([lf.get("risk_level", "medium") for lf in light_files_chunk])
+
+def _merge_tier(partials: List[Dict[str, Any]]) -> str:
+    return route_summary([p.get("overall_risk", "medium") for p in partials])
+
 def _summarize_chunk(meta: dict, light_files_chunk: List[Dict[str, Any]]) -> Dict[str, Any]:
-    """청크 단위 부분 요약"""
-    resp = oai.chat.completions.create(
-        model=OPENAI_MODEL,
-        response_format={"type":"json_object"},
-        messages=[
-            {"role":"system","content":"아래 파일 변경 요약을 바탕으로 커밋의 의도/영향을 5줄 내로 JSON으로 반환(overall_summary, overall_risk: low/medium/high)."},
-            {"role":"user","content": json.dumps({"meta": {
-                "repo": meta.get("repo",""),
-                "sha": meta.get("sha",""),
-                "title": meta.get("title","")
-            }, "files": light_files_chunk}, ensure_ascii=False)}
-        ]
-    )
-    out = resp.choices[0].message.content
-    try:
-        return json.loads(out)
-    except Exception:
-        return {"overall_summary":"(부분 요약 파싱 실패)","overall_risk":"medium"}
+    """청크 단위 부분 요약 (파일 위험도로 모델 선택)"""
+    out = _chat(stage="summarize_chunk", tier=_chunk_tier(light_files_chunk), messages=_chunk_messages(meta, light_files_chunk))
+    return _parse_summary(out, _CHUNK_PARSE_FAILED)
 
-@retry(wait=wait_random_exponential(min=1, max=20), stop=stop_after_attempt(4))
-def _summarize_merge(partials: List[str]) -> Dict[str, Any]:
-    """부분 요약들을 최종 통합"""
-    prompt = "\n\n".join(partials)
-    resp = oai.chat.completions.create(
-        model=OPENAI_MODEL,
-        response_format={"type":"json_object"},
-        messages=[
-            {"role":"system","content":"부분 요약들을 통합해 최종 overall_summary(6~10문장)와 overall_risk(low/medium/high)만 JSON으로 반환."},
-            {"role":"user","content": prompt}
-        ]
-    )
-    out = resp.choices[0].message.content
-    try:
-        return json.loads(out)
-    except Exception:
-        return {"overall_summary":"(최종 통합 요약 파싱 실패)","overall_risk":"medium"}
+def _summarize_merge(partials: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """부분 요약들을 최종 통합 (부분 요약 위험도로 모델 선택)"""
+    out = _chat(stage="summarize_merge", tier=_merge_tier(partials), messages=_merge_messages(partials))
+    return _parse_merge(out, partials)
+
+_RISK_ORDER = {"low": 0, "medium": 1, "high": 2}
+
+def _parse_merge(out: str, partials: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """통합 결과 파싱. 위험도는 입력 부분 요약 중 가장 높은 값 아래로 내려가지 않게 보정"""
+    merged = _parse_summary(out, _MERGE_PARSE_FAILED, "summarize_merge")
+    highest = max((p.get("overall_risk", "medium") for p in partials), key=lambda r: _RISK_ORDER.get(r, 1))
+    if _RISK_ORDER.get(merged.get("overall_risk"), 1) < _RISK_ORDER.get(highest, 1):
+        merged["overall_risk"] = highest
+    return merged
+
+def merge_partials(partials: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """트리(map-reduce) 통합: 묶음별 통합을 병렬로 반복해 하나로 줄임 → 단계 수 ≈ log_{MERGE_FAN_IN}(청크 수),
+    통합 요청 1개의 입력은 팬인/토큰 예산을 넘지 않음"""
+    level = 0
+    while len(partials) > 1:
+        groups = _merge_groups(partials)
+        log.info(f"[COMMIT] 🌲 Merge level {level}: {len(partials)} partials → {len(groups)}")
+        with profile.stage("summarize_merge.level"):
+            partials = parallel_map(lambda g: g[0] if len(g) == 1 else _summarize_merge(g), groups, LLM_CONCURRENCY)
+        level += 1
+    return partials[0]
 
 def fallback_summarize_commit(files: List[FileFinding], meta: dict) -> CommitFinding:
     """모델 실패 시 로컬 요약으로 대체"""
@@ -236,65 +1275,497 @@ def fallback_summarize_commit(files: List[FileFinding], meta: dict) -> CommitFin
         overall_risk=("high" if any(f.risk_level=="high" for f in files) else "medium")
     )
 
+def _commit_cache_key(light_files: List[Dict[str, Any]]) -> str:
+    return LLMCache.make_key("commit", _routing_key(), COMMIT_CHUNK_PROMPT, COMMIT_MERGE_PROMPT, light_files)
+
+def _cache_commit_summary(key: str, final: Dict[str, Any]):
+    if llm_cache and final.get("overall_summary") not in _PARSE_FAILED_SUMMARIES:
+        llm_cache.put(key, "commit", {
+            "overall_summary": final.get("overall_summary",""),
+            "overall_risk": final.get("overall_risk","medium")
+        })
+
+def _summary_chunks(light_files: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+    """파일 수가 아닌 토큰 예산 기준으로 청크 분할"""
+    return pack_by_budget(light_files, lambda lf: estimate_tokens(json.dumps(lf, ensure_ascii=False)), SUMMARY_TOKEN_BUDGET)
+
+def _commit_finding(files: List[FileFinding], meta: dict, final: Dict[str, Any]) -> CommitFinding:
+    return CommitFinding(
+        repo=meta["repo"],
+        sha=meta["sha"],
+        author=meta.get("author"),
+        author_login=meta.get("author_login"),
+        author_email=meta.get("author_email"),
+        date_kst=meta["date_kst"],
+        title=meta["title"],
+        files=files,
+        overall_summary=final.get("overall_summary",""),
+        overall_risk=final.get("overall_risk","medium")
+    )
+
 def summarize_commit(files: List[FileFinding], meta: dict) -> CommitFinding:
     """
     커밋 요약:
     - 입력 슬림화
-    - 파일 많을 경우 청크 요약 → 최종 통합
+    - 입력이 SUMMARY_TOKEN_BUDGET 을 넘으면 청크 요약(병렬) → 트리 통합
     - 실패 시 BadRequest 메시지 출력 + 로컬 Fallback
     """
     light_files = _lighten_files(files)
+    key = _commit_cache_key(light_files)
+    cached = llm_cache.get(key) if llm_cache else None
+    chunks = _summary_chunks(light_files)
     try:
-        # 파일 수가 적으면 1회 호출로 끝내기
-        if len(light_files) <= MAX_FILES_PER_CALL:
+        if cached is not None:
+            final = cached
+        # 입력이 예산 안이면 1회 호출로 끝내기
+        elif len(chunks) <= 1:
             partial = _summarize_chunk(meta, light_files)
             final = partial
         else:
-            # 청크 요약
-            chunks = [light_files[i:i+MAX_FILES_PER_CALL] for i in range(0, len(light_files), MAX_FILES_PER_CALL)]
-            partial_summaries = []
-            for idx, ch in enumerate(chunks, 1):
-                partial = _summarize_chunk(meta, ch)
-                partial_summaries.append(partial.get("overall_summary",""))
-            final = _summarize_merge(partial_summaries)
-
-        return CommitFinding(
-            repo=meta["repo"],
-            sha=meta["sha"],
-            author=meta.get("author"),
-            author_login=meta.get("author_login"),
-            author_email=meta.get("author_email"),
-            date_kst=meta["date_kst"],
-            title=meta["title"],
-            files=files,
-            overall_summary=final.get("overall_summary",""),
-            overall_risk=final.get("overall_risk","medium")
-        )
+            # 청크 요약 (병렬 호출, 결과는 청크 순서 유지)
+            partials = parallel_map(lambda ch: _summarize_chunk(meta, ch), chunks, LLM_CONCURRENCY)
+            final = merge_partials(partials)
+
+        if cached is None:
+            _cache_commit_summary(key, final)
+        return _commit_finding(files, meta, final)
     except BadRequestError as e:
         # 상세 메시지 최대한 표시
         msg = getattr(e, "message", str(e))
-        print(f"[COMMIT] ❌ BadRequest while summarizing {meta['sha'][:7]}: {msg}")
+        log.error(f"[COMMIT] ❌ BadRequest while summarizing {meta['sha'][:7]}: {msg}")
         return fallback_summarize_commit(files, meta)
     except Exception as e:
-        print(f"[COMMIT] ❌ Unexpected error while summarizing {meta['sha'][:7]}: {e}")
+        log.error(f"[COMMIT] ❌ Unexpected error while summarizing {meta['sha'][:7]}: {e}")
         return fallback_summarize_commit(files, meta)
 
+# ======================================
+# 📮 5-1. OpenAI Batch API
+# ======================================
+class BatchRunner:
+    """OpenAI Batch API 실행기: 요청(custom_id → messages)을 JSONL 로 업로드해 배치 생성 → 완료까지 폴링 → 결과 수집.
+    state_dir/<stage>.* 에 입력/배치 상태/결과를 남겨, 재시작 시 받은 결과는 다시 요청하지 않고 진행 중 배치는 이어서 폴링한다"""
+    _TERMINAL = {"completed", "failed", "expired", "cancelled"}
+
+    def __init__(self, client, state_dir: str, poll_seconds: float = 30, max_wait_hours: float = 24):
+        self.client = client
+        self.state_dir = state_dir
+        self.poll_seconds = poll_seconds
+        self.max_wait_hours = max_wait_hours
+
+    def _path(self, stage: str, suffix: str) -> str:
+        return os.path.join(self.state_dir, f"{stage}.{suffix}")
+
+    def _load_results(self, stage: str) -> Dict[str, str]:
+        results: Dict[str, str] = {}
+        path = self._path(stage, "results.jsonl")
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        d = json.loads(line)
+                    except ValueError:  # 크래시로 잘린 마지막 줄
+                        continue
+                    results[d["custom_id"]] = d["content"]
+        return results
+
+    def _load_batch(self, stage: str) -> Optional[Dict[str, Any]]:
+        path = self._path(stage, "batch.json")
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _save_batch(self, stage: str, info: Dict[str, Any]):
+        path = self._path(stage, "batch.json")
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(info, f, indent=2, ensure_ascii=False)
+        os.replace(path + ".tmp", path)
+
+    def run(self, stage: str, requests: Dict[str, List[Dict[str, str]]],
+            models: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+        """custom_id → 응답 content. 실패/누락된 요청은 결과에 없음. models 는 custom_id → 모델 (없으면 OPENAI_MODEL)"""
+        os.makedirs(self.state_dir, exist_ok=True)
+        results = self._load_results(stage)
+        info = self._load_batch(stage)
+        if info and not info.get("collected"):
+            log.info(f"[BATCH] ⏯️  Resuming {stage} batch {info['batch_id']}")
+            self._collect(stage, info, results)
+        todo = {k: v for k, v in requests.items() if k not in results}
+        if len(todo) < len(requests):
+            log.info(f"[BATCH] ♻️  {len(requests) - len(todo)}/{len(requests)} {stage} results reused from {self.state_dir}")
+        if todo:
+            self._collect(stage, self._submit(stage, todo, models or {}), results)
+        return {k: results[k] for k in requests if k in results}
+
+    def _submit(self, stage: str, todo: Dict[str, List[Dict[str, str]]], models: Dict[str, str]) -> Dict[str, Any]:
+        path = self._path(stage, "input.jsonl")
+        with open(path, "w", encoding="utf-8") as f:
+            for custom_id, messages in todo.items():
+                f.write(json.dumps({
+                    "custom_id": custom_id, "method": "POST", "url": "/v1/chat/completions",
+                    "body": {"model": models.get(custom_id, OPENAI_MODEL), "response_format": {"type": "json_object"},
+                             "messages": messages}
+                }, ensure_ascii=False) + "\n")
+        with open(path, "rb") as f:
+            uploaded = self.client.files.create(file=(os.path.basename(path), f.read()), purpose="batch")
+        batch = self.client.post("/batches", cast_to=Dict[str, Any], body={
+            "input_file_id": uploaded.id,
+            "endpoint": "/v1/chat/completions",
+            "completion_window": "24h",
+            "metadata": {"stage": stage}
+        })
+        info = {"batch_id": batch["id"], "input_file_id": uploaded.id, "requests": len(todo),
+                "submitted_at": dt.datetime.now(dt.timezone.utc).isoformat(), "collected": False}
+        self._save_batch(stage, info)
+        profile.count("openai_batch_requests", len(todo))
+        log.info(f"[BATCH] 📤 Submitted {stage} batch {batch['id']} ({len(todo)} requests)")
+        return info
+
+    def _collect(self, stage: str, info: Dict[str, Any], results: Dict[str, str]):
+        """배치가 끝날 때까지 폴링 후 결과 파일을 results(.jsonl)에 추가"""
+        deadline = time.monotonic() + self.max_wait_hours * 3600 if self.max_wait_hours > 0 else None
+        with profile.stage(f"openai.batch.{stage}"):
+            while True:
+                batch = self.client.get(f"/batches/{info['batch_id']}", cast_to=Dict[str, Any])
+                status = batch.get("status")
+                if status in self._TERMINAL:
+                    break
+                if deadline is not None and time.monotonic() > deadline:
+                    raise TimeoutError(f"batch {info['batch_id']} still {status} after {self.max_wait_hours}h")
+                counts = batch.get("request_counts") or {}
+                log.info(f"[BATCH] ⏳ {stage} batch {info['batch_id']}: {status} "
+                         f"({counts.get('completed', 0)}/{counts.get('total') or info['requests']})")
+                time.sleep(self.poll_seconds)
+
+        failed = (batch.get("request_counts") or {}).get("failed", 0)  # 오류 파일로 빠진 요청
+        if batch.get("output_file_id"):
+            text = self.client.files.content(batch["output_file_id"]).text
+            with open(self._path(stage, "results.jsonl"), "a", encoding="utf-8") as out:
+                for line in text.splitlines():
+                    if not line.strip():
+                        continue
+                    d = json.loads(line)
+                    response = d.get("response") or {}
+                    if response.get("status_code") != 200:
+                        failed += 1
+                        continue
+                    body = response.get("body") or {}
+                    content = body["choices"][0]["message"]["content"]
+                    profile.add_usage(body.get("model", OPENAI_MODEL), body.get("usage"), OPENAI_BATCH_PRICE_FACTOR)
+                    out.write(json.dumps({"custom_id": d["custom_id"], "content": content}, ensure_ascii=False) + "\n")
+                    results[d["custom_id"]] = content
+        profile.count("openai_batch_failed", failed)
+        info.update(collected=True, status=status)
+        self._save_batch(stage, info)
+        log.info(f"[BATCH] 📥 {stage} batch {info['batch_id']} {status}: {len(results)} results, {failed} failed")
+
 # ======================================
 # 🔍 6. GitHub 커밋 필터
 # ======================================
+def _is_mine(login: Optional[str], email: Optional[str]) -> bool:
+    return bool(
+        (login and login.strip().lower() == MY_GITHUB_LOGIN.strip().lower()) or
+        (email and email.strip().lower() == MY_GITHUB_EMAIL.strip().lower())
+    )
+
 def commit_is_mine(commit) -> bool:
     login = getattr(commit.author, "login", None)
     email = getattr(commit.commit.author, "email", None)
-    return (
-        (login and login.strip().lower() == MY_GITHUB_LOGIN.strip().lower()) or
-        (email and email.strip().lower() == MY_GITHUB_EMAIL.strip().lower())
+    return _is_mine(login, email)
+
+class CommitRef:
+    """목록 조회 단계에서 얻는 커밋 메타데이터 (파일/patch 는 별도 조회)"""
+    def __init__(self, sha: str, title: str, author: Optional[str], author_login: Optional[str],
+                 author_email: Optional[str], authored_at: dt.datetime, committed_at: dt.datetime,
+                 changed_files: Optional[int] = None):
+        self.sha = sha
+        self.title = title
+        self.author = author
+        self.author_login = author_login
+        self.author_email = author_email
+        self.authored_at = authored_at
+        self.committed_at = committed_at
+        self.changed_files = changed_files  # 알 수 없으면 None
+
+    @classmethod
+    def from_rest(cls, c) -> "CommitRef":
+        """PyGithub Commit(목록 응답)에서 변환 — commit/author 필드는 목록 응답에 포함되어 추가 호출 없음"""
+        a = c.commit.author
+        return cls(
+            sha=c.sha,
+            title=(c.commit.message or "").splitlines()[0].strip() if c.commit.message else "",
+            author=a.name if a else None,
+            author_login=getattr(c.author, "login", None),
+            author_email=a.email if a else None,
+            authored_at=_as_utc(a.date) if a else _as_utc(c.commit.committer.date),
+            committed_at=_as_utc(c.commit.committer.date)
+        )
+
+def _author_queries() -> List[str]:
+    """서버측 author= 필터 값 (로그인과 이메일은 별도 조회 후 합집합)"""
+    values = [v for v in (MY_GITHUB_LOGIN, MY_GITHUB_EMAIL) if v and v.strip()]
+    return list(dict.fromkeys(v.strip() for v in values))
+
+def list_commits_rest(repo, since_utc: dt.datetime, until_utc: dt.datetime) -> List[CommitRef]:
+    """REST 목록 조회. AUTHOR_FILTER_SERVER_SIDE 면 author= 로 본인 커밋만 받아온다"""
+    if AUTHOR_FILTER_SERVER_SIDE:
+        by_sha: Dict[str, Any] = {}
+        for author in _author_queries():
+            commits = repo.get_commits(sha=BRANCH, since=since_utc, until=until_utc, author=author)
+            for c in gh_call(lambda: list(commits)):
+                by_sha.setdefault(c.sha, c)
+        listed = list(by_sha.values())
+    else:
+        commits = repo.get_commits(sha=BRANCH, since=since_utc, until=until_utc)
+        listed = gh_call(lambda: list(commits))
+    refs = [CommitRef.from_rest(c) for c in listed if commit_is_mine(c)]
+    # 여러 번 조회한 결과를 합쳤으므로 GitHub 기본 순서(최신 → 과거)로 다시 정렬
+    refs.sort(key=lambda r: r.committed_at, reverse=True)
+    return refs
+
+_GRAPHQL_HISTORY = """
+query($owner: String!, $name: String!, $branch: String!, $since: GitTimestamp!, $until: GitTimestamp!,
+      $author: CommitAuthor, $after: String) {
+  repository(owner: $owner, name: $name) {
+    ref(qualifiedName: $branch) {
+      target {
+        ... on Commit {
+          history(first: 100, since: $since, until: $until, author: $author, after: $after) {
+            pageInfo { hasNextPage endCursor }
+            nodes {
+              oid messageHeadline authoredDate committedDate changedFilesIfAvailable
+              author { name email user { login } }
+            }
+          }
+        }
+      }
+    }
+  }
+}
+"""
+
+_graphql_client = httpx.Client(timeout=30)
+_graphql_user_ids: Dict[str, Optional[str]] = {}
+
+def graphql(query: str, variables: Dict[str, Any]) -> Dict[str, Any]:
+    """GitHub GraphQL 호출 (오류 응답은 예외)"""
+    profile.count("github_graphql_calls")
+    resp = _graphql_client.post(
+        GITHUB_GRAPHQL_URL,
+        json={"query": query, "variables": variables},
+        headers={"Authorization": f"bearer {GITHUB_TOKEN}"}
+    )
+    resp.raise_for_status()
+    data = resp.json()
+    if data.get("errors"):
+        raise RuntimeError(f"GraphQL error: {data['errors'][0].get('message')}")
+    return data["data"]
+
+def _graphql_user_id(login: str) -> Optional[str]:
+    if login not in _graphql_user_ids:
+        data = graphql("query($login: String!) { user(login: $login) { id } }", {"login": login})
+        _graphql_user_ids[login] = (data.get("user") or {}).get("id")
+    return _graphql_user_ids[login]
+
+def list_commits_graphql(repo_full: str, since_utc: dt.datetime, until_utc: dt.datetime) -> List[CommitRef]:
+    """GraphQL 목록 조회: 요청 1회에 커밋 100개의 메타데이터 + 변경 파일 수.
+    GraphQL Commit 에는 파일별 patch 필드가 없으므로 patch 는 여전히 REST get_commit 으로 가져온다."""
+    owner, name = repo_full.split("/", 1)
+    filters: List[Dict[str, Any]] = []
+    user_id = _graphql_user_id(MY_GITHUB_LOGIN) if MY_GITHUB_LOGIN.strip() else None
+    if user_id:
+        filters.append({"id": user_id})
+    if MY_GITHUB_EMAIL.strip():
+        filters.append({"emails": [MY_GITHUB_EMAIL.strip()]})
+
+    by_sha: Dict[str, CommitRef] = {}
+    for author in filters:
+        after = None
+        while True:
+            data = graphql(_GRAPHQL_HISTORY, {
+                "owner": owner, "name": name, "branch": f"refs/heads/{BRANCH}",
+                "since": since_utc.isoformat(), "until": until_utc.isoformat(),
+                "author": author, "after": after
+            })
+            target = ((data.get("repository") or {}).get("ref") or {}).get("target") or {}
+            history = target.get("history") or {"nodes": [], "pageInfo": {}}
+            for n in history["nodes"]:
+                a = n.get("author") or {}
+                ref = CommitRef(
+                    sha=n["oid"], title=n.get("messageHeadline", ""),
+                    author=a.get("name"), author_login=(a.get("user") or {}).get("login"),
+                    author_email=a.get("email"),
+                    authored_at=_as_utc(dt.datetime.fromisoformat(n["authoredDate"].replace("Z", "+00:00"))),
+                    committed_at=_as_utc(dt.datetime.fromisoformat(n["committedDate"].replace("Z", "+00:00"))),
+                    changed_files=n.get("changedFilesIfAvailable")
+                )
+                if _is_mine(ref.author_login, ref.author_email):
+                    by_sha.setdefault(ref.sha, ref)
+            if not history["pageInfo"].get("hasNextPage"):
+                break
+            after = history["pageInfo"]["endCursor"]
+    return sorted(by_sha.values(), key=lambda r: r.committed_at, reverse=True)
+
+class ChangedFile:
+    """커밋의 변경 파일 1개 — PyGithub File 과 같은 속성 이름(filename, status, patch)"""
+    def __init__(self, filename: str, status: str, patch: Optional[str], previous_filename: Optional[str] = None):
+        self.filename = filename
+        self.status = status
+        self.patch = patch
+        self.previous_filename = previous_filename
+
+class GitHubCommitSource:
+    """GitHub API 기반 커밋 소스 (목록: REST 또는 GraphQL, 파일/patch: REST)"""
+    def __init__(self, repo_full: str):
+        self.repo_full = repo_full
+        # lazy: 리포지토리 메타데이터 조회(GET /repos/..) 생략, 첫 목록/상세 호출에서 존재 여부 확인
+        self.repo = gh.get_repo(repo_full, lazy=True)
+
+    def list_commits(self, since_utc: dt.datetime, until_utc: dt.datetime) -> List[CommitRef]:
+        if GITHUB_GRAPHQL:
+            return list_commits_graphql(self.repo_full, since_utc, until_utc)
+        return list_commits_rest(self.repo, since_utc, until_utc)
+
+    def get_files(self, sha: str) -> List[ChangedFile]:
+        co = gh_call(self.repo.get_commit, sha)
+        # files 는 get_commit 응답에 이미 들어 있어 추가 요청 없음
+        return [
+            ChangedFile(f.filename, f.status, getattr(f, "patch", None), getattr(f, "previous_filename", None))
+            for f in co.files
+        ]
+
+# git --name-status 코드 → GitHub files[].status
+_GIT_STATUS = {"A": "added", "M": "modified", "D": "removed", "R": "renamed", "C": "copied", "T": "changed"}
+
+class LocalGitCommitSource:
+    """로컬 bare 미러 기반 커밋 소스 (git fetch + git log + git diff, API 호출/patch 잘림 없음)"""
+    def __init__(self, repo_full: str, mirror_dir: str = MIRROR_DIR, remote_url: Optional[str] = None):
+        self.repo_full = repo_full
+        self.git_dir = os.path.join(mirror_dir, *repo_full.split("/")) + ".git"
+        self.remote_url = remote_url or GIT_REMOTE_TEMPLATE.format(repo=repo_full)
+        self._synced = False
+
+    def _git(self, *args: str, auth: bool = False) -> str:
+        cmd = ["git", "-c", "core.quotePath=false"]
+        env = None
+        if auth and GITHUB_TOKEN and self.remote_url.startswith("https://"):
+            # 토큰은 환경변수 설정(GIT_CONFIG_*)으로만 전달: 명령줄(ps 에 보임)과 미러 config 에 남기지 않음
+            basic = base64.b64encode(f"x-access-token:{GITHUB_TOKEN}".encode()).decode()
+            env = dict(os.environ)
+            n = int(env.get("GIT_CONFIG_COUNT") or 0)
+            env.update({"GIT_CONFIG_COUNT": str(n + 1), f"GIT_CONFIG_KEY_{n}": "http.extraHeader",
+                        f"GIT_CONFIG_VALUE_{n}": f"Authorization: basic {basic}"})
+        if os.path.isdir(self.git_dir):
+            cmd += ["--git-dir", self.git_dir]
+        profile.count("git_commands")
+        out = subprocess.run(cmd + list(args), capture_output=True, check=True, env=env)
+        return out.stdout.decode("utf-8", errors="replace")
+
+    def sync(self):
+        """미러가 없으면 clone --mirror, 있으면 fetch (실행당 1회)"""
+        if self._synced:
+            return
+        if not os.path.isdir(self.git_dir):
+            log.info(f"[GIT] 📥 Cloning mirror {self.remote_url} → {self.git_dir}")
+            os.makedirs(os.path.dirname(self.git_dir), exist_ok=True)
+            self._git("clone", "--mirror", "--quiet", self.remote_url, self.git_dir, auth=True)
+        elif GIT_FETCH:
+            log.info(f"[GIT] 🔄 Fetching {self.repo_full}")
+            self._git("fetch", "--prune", "--quiet", "origin", auth=True)
+        self._synced = True
+
+    def list_commits(self, since_utc: dt.datetime, until_utc: dt.datetime) -> List[CommitRef]:
+        self.sync()
+        args = ["log", f"refs/heads/{BRANCH}", f"--since={since_utc.isoformat()}", f"--until={until_utc.isoformat()}",
+                "--format=%H%x1f%an%x1f%ae%x1f%aI%x1f%cI%x1f%s%x1e"]
+        authors = _author_queries()
+        if authors:
+            # 여러 --author 는 OR 로 동작, 이메일/로그인은 고정 문자열로 매칭
+            args += ["--fixed-strings", "--regexp-ignore-case"] + [f"--author={a}" for a in authors]
+        refs = []
+        for rec in self._git(*args).split("\x1e"):
+            rec = rec.strip("\n")
+            if not rec:
+                continue
+            sha, name, email, authored, committed, subject = rec.split("\x1f", 5)
+            committed_at = _as_utc(dt.datetime.fromisoformat(committed))
+            if committed_at >= until_utc:
+                continue  # --until 은 경계 포함이므로 제외
+            if authors and not _is_mine_local(name, email):
+                continue  # --author 는 부분 문자열 매칭이라 한 번 더 정확히 확인
+            refs.append(CommitRef(
+                sha=sha, title=subject.strip(), author=name, author_login=None, author_email=email,
+                authored_at=_as_utc(dt.datetime.fromisoformat(authored)), committed_at=committed_at
+            ))
+        return refs
+
+    def get_files(self, sha: str) -> List[ChangedFile]:
+        self.sync()
+        parents = self._git("rev-list", "--parents", "-n", "1", sha).split()[1:]
+        # 머지 커밋은 GitHub 와 같이 첫 번째 부모 기준 diff, 루트 커밋은 빈 트리 기준
+        base = ["diff", parents[0], sha] if parents else ["diff-tree", "--root", "--no-commit-id", sha]
+        status_out = self._git(*base[:1], "-r", "-M", "--name-status", "-z", *base[1:])
+        patch_out = self._git(*base[:1], "-r", "-M", "-p", "--no-color", "--no-ext-diff", *base[1:])
+
+        entries = []
+        tokens = status_out.split("\0")
+        i = 0
+        while i < len(tokens) and tokens[i]:
+            code = tokens[i][0]
+            if code in ("R", "C"):
+                entries.append((code, tokens[i + 2], tokens[i + 1]))
+                i += 3
+            else:
+                entries.append((code, tokens[i + 1], None))
+                i += 2
+
+        blocks = _split_diff_blocks(patch_out)
+        files = []
+        for idx, (code, path, old_path) in enumerate(entries):
+            block = blocks[idx] if idx < len(blocks) else ""
+            files.append(ChangedFile(path, _GIT_STATUS.get(code, "modified"), _patch_from_block(block), old_path))
+        return files
+
+def _is_mine_local(name: str, email: str) -> bool:
+    """로컬 커밋에는 GitHub 로그인이 없으므로 이메일, 이름==로그인, noreply 이메일로 판별"""
+    login = MY_GITHUB_LOGIN.strip().lower()
+    email = (email or "").strip().lower()
+    return bool(
+        _is_mine(None, email) or
+        (login and (name or "").strip().lower() == login) or
+        (login and (email == f"{login}@users.noreply.github.com" or email.endswith(f"+{login}@users.noreply.github.com")))
     )
 
+def _split_diff_blocks(diff_text: str) -> List[str]:
+    """git diff 출력을 파일별 블록으로 분리 (name-status 와 같은 순서)"""
+    blocks: List[List[str]] = []
+    for line in diff_text.splitlines(keepends=True):
+        if line.startswith("diff --git "):
+            blocks.append([])
+        if blocks:
+            blocks[-1].append(line)
+    return ["".join(b) for b in blocks]
+
+def _patch_from_block(block: str) -> Optional[str]:
+    """파일 블록에서 헤더를 떼고 GitHub patch 형식(첫 @@ 부터)만 남김. 바이너리/내용 변경 없음은 None"""
+    pos = block.find("\n@@")
+    if pos < 0:
+        return None
+    return block[pos + 1:].rstrip("\n") or None
+
+def make_commit_source(repo_full: str):
+    """COMMIT_SOURCE 설정에 맞는 커밋 소스 생성"""
+    if COMMIT_SOURCE == "local":
+        return LocalGitCommitSource(repo_full)
+    if COMMIT_SOURCE == "github":
+        return GitHubCommitSource(repo_full)
+    raise ValueError(f"Unknown COMMIT_SOURCE: {COMMIT_SOURCE} (github | local)")
+
 # ======================================
 # 🧾 7. 결과 출력
 # ======================================
-def render_md(report: ReportModel) -> str:
-    lines = [
+def _render_md_header(report: ReportModel) -> List[str]:
+    return [
         f"# 🧠 연구노트 — {report.note_date_kst} (KST)",
         "",
         f"- 생성시각(UTC): {report.generated_at}",
@@ -302,10 +1773,34 @@ def render_md(report: ReportModel) -> str:
         f"- 리포지토리: {', '.join(report.repos)}",
         f"- 브랜치: {report.branch}",
         f"- 작성자: {report.author_filter}",
+        *([f"- 중복 diff 재사용: {report.dedup_saved_calls}개 파일 (LLM 분석 생략)"] if report.dedup_saved_calls else []),
         ""
     ]
+
+def _render_md_commit(c: CommitFinding) -> List[str]:
+    lines = [
+        f"### 🔖 {c.sha[:7]} — {c.title}",
+        f"- Date: {c.date_kst}",
+        f"- Risk: **{c.overall_risk}**",
+        f"- Repository: {c.repo}",
+        f"- Commit Link: https://github.com/{c.repo}/commit/{c.sha}",
+        "",
+        "> " + (c.overall_summary or "(요약 없음)").replace("\n", "\n> "),
+        "",
+        "**📁 변경된 파일들:**"
+    ]
+    for f in c.files:
+        lines.append(f"- `{f.file_path}` ({f.change_type}, risk={f.risk_level})")
+        lines.append(f"  - {f.summary}")
+    lines.append("")
+    return lines
+
+_MD_NO_COMMITS = "> 오늘은 본인 커밋이 없습니다."
+
+def render_md(report: ReportModel) -> str:
+    lines = _render_md_header(report)
     if not report.commits:
-        lines.append("> 오늘은 본인 커밋이 없습니다.")
+        lines.append(_MD_NO_COMMITS)
         return "\n".join(lines)
 
     current_repo = None
@@ -313,158 +1808,833 @@ def render_md(report: ReportModel) -> str:
         if c.repo != current_repo:
             current_repo = c.repo
             lines.append(f"## 📦 {current_repo}\n")
-        lines.append(f"### 🔖 {c.sha[:7]} — {c.title}")
-        lines.append(f"- Date: {c.date_kst}")
-        lines.append(f"- Risk: **{c.overall_risk}**")
-        lines.append(f"- Repository: {c.repo}")
-        lines.append(f"- Commit Link: https://github.com/{c.repo}/commit/{c.sha}")
-        lines.append("")
-        lines.append("> " + (c.overall_summary or "(요약 없음)").replace("\n", "\n> "))
-        lines.append("")
-        lines.append("**📁 변경된 파일들:**")
-        for f in c.files:
-            lines.append(f"- `{f.file_path}` ({f.change_type}, risk={f.risk_level})")
-            lines.append(f"  - {f.summary}")
-        lines.append("")
+        lines.extend(_render_md_commit(c))
     return "\n".join(lines)
 
+class ReportWriter:
+    """스트리밍 리포트 출력: 커밋이 끝날 때마다 JSONL/Markdown 에 바로 추가하고,
+    마지막에 JSONL 을 읽어 research_note_*.json/.md 를 레포별로 다시 조립한다.
+    JSONL 은 다음 실행(증분/크래시 후 재시작)에서 이미 처리된 커밋을 건너뛰는 기준이 된다."""
+    def __init__(self, header: ReportModel, out_dir: str = OUT_DIR):
+        self.header = header
+        base = os.path.join(out_dir, f"research_note_{header.note_date_kst.replace('-','')}")
+        self.jsonl_path = base + ".jsonl"
+        self.md_path = base + ".md"
+        self.json_path = base + ".json"
+        self.appended = 0
+        self._lock = threading.Lock()
+        self._repair_tail()
+
+    def _repair_tail(self):
+        """크래시로 잘린 마지막 줄 제거"""
+        if not os.path.exists(self.jsonl_path):
+            return
+        with open(self.jsonl_path, "rb+") as f:
+            data_end = f.seek(0, os.SEEK_END)
+            if data_end == 0:
+                return
+            f.seek(data_end - 1)
+            if f.read(1) == b"\n":
+                return
+            pos = data_end - 1
+            while pos > 0:
+                f.seek(pos - 1)
+                if f.read(1) == b"\n":
+                    break
+                pos -= 1
+            f.truncate(pos)
+
+    def reset(self):
+        """이전 실행 결과 무시 (전체 재생성)"""
+        if os.path.exists(self.jsonl_path):
+            os.remove(self.jsonl_path)
+
+    def seed_from_json(self) -> int:
+        """JSONL 없이 기존 research_note JSON 만 있으면 그 커밋들로 JSONL 을 채움"""
+        if os.path.exists(self.jsonl_path) or not os.path.exists(self.json_path):
+            return 0
+        try:
+            with open(self.json_path, "r", encoding="utf-8") as f:
+                commits = json.load(f).get("commits", [])
+        except Exception as e:
+            log.warning(f"[STATE] ⚠️ Could not read existing report {self.json_path}: {e}")
+            return 0
+        with open(self.jsonl_path, "w", encoding="utf-8") as f:
+            for c in commits:
+                f.write(json.dumps(c, ensure_ascii=False) + "\n")
+        return len(commits)
+
+    def previous_header(self) -> Dict[str, Any]:
+        """기존 research_note JSON 의 헤더(commits 앞부분)만 읽음. finalize 가 헤더를 맨 앞에 쓰므로 전체를 읽지 않는다"""
+        try:
+            with open(self.json_path, "r", encoding="utf-8") as f:
+                head = f.read(64 * 1024)
+            cut = head.find('\n  "commits": [')
+            return json.loads(head[:cut].rstrip().rstrip(",") + "\n}") if cut >= 0 else {}
+        except (OSError, ValueError):
+            return {}
+
+    def _iter_records(self):
+        """(파일 오프셋, dict) 스트리밍. 손상된 줄은 건너뜀"""
+        if not os.path.exists(self.jsonl_path):
+            return
+        with open(self.jsonl_path, "rb") as f:
+            while True:
+                offset = f.tell()
+                line = f.readline()
+                if not line:
+                    break
+                try:
+                    yield offset, json.loads(line)
+                except ValueError:
+                    continue
+
+    def done_shas(self) -> Dict[str, set]:
+        done: Dict[str, set] = collections.defaultdict(set)
+        for _, d in self._iter_records():
+            done[d["repo"]].add(d["sha"])
+        return done
+
+    def append(self, c: CommitFinding):
+        """완료된 커밋 1개를 JSONL 과 Markdown 에 즉시 기록"""
+        with self._lock:
+            with open(self.jsonl_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(c.to_dict(), ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            new_md = not os.path.exists(self.md_path)
+            with open(self.md_path, "a", encoding="utf-8") as f:
+                if new_md:
+                    f.write("\n".join(_render_md_header(self.header)))
+                f.write("\n" + "\n".join(_render_md_commit(c)))
+            self.appended += 1
+
+    def finalize(self) -> int:
+        """JSONL → 최종 JSON/Markdown (레포 순서, 레포 내 최신순). 메모리에는 인덱스만 유지"""
+        index: Dict[Tuple[str, str], Tuple[str, str, int]] = {}
+        for offset, d in self._iter_records():
+            index[(d["repo"], d["sha"])] = (d["repo"], d.get("date_kst", ""), offset)  # 같은 커밋은 마지막 기록 우선
+        repos = list(self.header.repos) + [r for r, _, _ in index.values() if r not in self.header.repos]
+        repo_order = {r: i for i, r in enumerate(dict.fromkeys(repos))}
+        entries = sorted(index.values(), key=lambda e: e[2])
+        entries.sort(key=lambda e: e[1], reverse=True)
+        entries.sort(key=lambda e: repo_order[e[0]])
+
+        envelope = self.header.to_dict()
+        envelope.pop("commits")
+        head = json.dumps(envelope, indent=2, ensure_ascii=False)[:-2]  # 마지막 "\n}" 제거
+
+        md_tmp, json_tmp = self.md_path + ".tmp", self.json_path + ".tmp"
+        with open(self.jsonl_path if entries else os.devnull, "rb") as src, \
+             open(md_tmp, "w", encoding="utf-8") as md, open(json_tmp, "w", encoding="utf-8") as js:
+            md.write("\n".join(_render_md_header(self.header)))
+            js.write(head + ",\n  \"commits\": [")
+            if not entries:
+                md.write("\n" + _MD_NO_COMMITS)
+                js.write("]\n}")
+            current_repo = None
+            for n, (repo_full, _, offset) in enumerate(entries):
+                src.seek(offset)
+                d = json.loads(src.readline())
+                if repo_full != current_repo:
+                    current_repo = repo_full
+                    md.write(f"\n## 📦 {current_repo}\n")
+                md.write("\n" + "\n".join(_render_md_commit(CommitFinding.from_dict(d))))
+                body = json.dumps(d, indent=2, ensure_ascii=False).replace("\n", "\n    ")
+                js.write(("," if n else "") + "\n    " + body)
+            if entries:
+                js.write("\n  ]\n}")
+        os.replace(md_tmp, self.md_path)
+        os.replace(json_tmp, self.json_path)
+        return len(entries)
+
+# ======================================
+# 🗄️ 7-1. 분석 이력 저장소 (SQLite 색인)
+# ======================================
+_RISK_RANK = {"low": 1, "medium": 2, "high": 3}
+
+class AnalyticsStore:
+    """research_note_*.json 을 커밋/파일 단위 행으로 색인하는 SQLite 저장소.
+    리포트 파일이 원본이고, 하루치 리포트를 다시 넣으면 그 날짜의 행을 통째로 교체한다."""
+    def __init__(self, path: str = ANALYTICS_DB):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS reports (
+                note_date TEXT PRIMARY KEY, generated_at TEXT, model TEXT, branch TEXT,
+                source TEXT, source_mtime REAL, source_size INTEGER, ingested_at REAL);
+            CREATE TABLE IF NOT EXISTS commits (
+                repo TEXT, sha TEXT, note_date TEXT, week TEXT, month TEXT, date_kst TEXT,
+                author TEXT, author_login TEXT, author_email TEXT, title TEXT,
+                overall_summary TEXT, overall_risk TEXT, risk_rank INTEGER, file_count INTEGER,
+                PRIMARY KEY (repo, sha));
+            CREATE TABLE IF NOT EXISTS files (
+                repo TEXT, sha TEXT, file_path TEXT, note_date TEXT, change_type TEXT, summary TEXT,
+                risk_level TEXT, risk_rank INTEGER, breaking_changes TEXT, test_impact TEXT,
+                migration_notes TEXT, owner_guess TEXT,
+                PRIMARY KEY (repo, sha, file_path));
+            CREATE INDEX IF NOT EXISTS idx_commits_date ON commits(note_date);
+            CREATE INDEX IF NOT EXISTS idx_commits_repo_date ON commits(repo, note_date);
+            CREATE INDEX IF NOT EXISTS idx_commits_risk_date ON commits(overall_risk, note_date);
+            CREATE INDEX IF NOT EXISTS idx_commits_week ON commits(week, repo);
+            CREATE INDEX IF NOT EXISTS idx_commits_month ON commits(month, repo);
+            CREATE INDEX IF NOT EXISTS idx_files_path ON files(file_path);
+            CREATE INDEX IF NOT EXISTS idx_files_date ON files(note_date);
+            CREATE INDEX IF NOT EXISTS idx_files_repo_date ON files(repo, note_date);
+            CREATE INDEX IF NOT EXISTS idx_files_risk_date ON files(risk_level, note_date);
+        """)
+        self._db.commit()
+
+    @staticmethod
+    def period_keys(note_date: str) -> Tuple[str, str]:
+        """YYYY-MM-DD → (ISO 주 'YYYY-Www', 월 'YYYY-MM')"""
+        year, week, _ = dt.date.fromisoformat(note_date).isocalendar()
+        return f"{year}-W{week:02d}", note_date[:7]
+
+    def ingest_report(self, report: Dict[str, Any], source: Optional[str] = None,
+                      mtime: float = 0.0, size: int = 0) -> int:
+        """ReportModel.to_dict() 형태 1개 색인 → 커밋 수"""
+        note_date = report["note_date_kst"]
+        week, month = self.period_keys(note_date)
+        commits = report.get("commits") or []
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM files WHERE note_date = ?", (note_date,))
+            self._db.execute("DELETE FROM commits WHERE note_date = ?", (note_date,))
+            for c in commits:
+                files = c.get("files") or []
+                risk = c.get("overall_risk", "medium")
+                self._db.execute("DELETE FROM files WHERE repo = ? AND sha = ?", (c["repo"], c["sha"]))
+                self._db.execute(
+                    "INSERT OR REPLACE INTO commits VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (c["repo"], c["sha"], note_date, week, month, c.get("date_kst", ""),
+                     c.get("author"), c.get("author_login"), c.get("author_email"), c.get("title", ""),
+                     c.get("overall_summary", ""), risk, _RISK_RANK.get(risk, 2), len(files))
+                )
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    [(c["repo"], c["sha"], f["file_path"], note_date, f.get("change_type"), f.get("summary", ""),
+                      f.get("risk_level", "medium"), _RISK_RANK.get(f.get("risk_level"), 2),
+                      json.dumps(f.get("breaking_changes") or [], ensure_ascii=False),
+                      json.dumps(f.get("test_impact") or [], ensure_ascii=False),
+                      json.dumps(f.get("migration_notes") or [], ensure_ascii=False), f.get("owner_guess"))
+                     for f in files]
+                )
+            self._db.execute(
+                "INSERT OR REPLACE INTO reports VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (note_date, report.get("generated_at"), report.get("model"), report.get("branch"),
+                 source, mtime, size, time.time())
+            )
+        return len(commits)
+
+    def ingest_file(self, path: str, force: bool = False) -> Optional[int]:
+        """research_note_*.json 1개 색인 → 커밋 수. 이미 같은 내용(mtime/크기)으로 색인돼 있으면 None"""
+        st = os.stat(path)
+        if not force:
+            with self._lock:
+                row = self._db.execute("SELECT 1 FROM reports WHERE source = ? AND source_mtime = ? AND source_size = ?",
+                                       (os.path.abspath(path), st.st_mtime, st.st_size)).fetchone()
+            if row is not None:
+                return None
+        with open(path, "r", encoding="utf-8") as f:
+            report = json.load(f)
+        return self.ingest_report(report, os.path.abspath(path), st.st_mtime, st.st_size)
+
+    def _select(self, sql: str, params: List[Any]) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [dict(r) for r in self._db.execute(sql, params).fetchall()]
+
+    @staticmethod
+    def _where(repo: Optional[str] = None, since: Optional[str] = None, until: Optional[str] = None,
+               prefix: str = "c") -> Tuple[List[str], List[Any]]:
+        clauses, params = [], []
+        if repo:
+            clauses.append(f"{prefix}.repo = ?"); params.append(repo)
+        if since:
+            clauses.append(f"{prefix}.note_date >= ?"); params.append(since)
+        if until:
+            clauses.append(f"{prefix}.note_date <= ?"); params.append(until)
+        return clauses, params
+
+    def query_files(self, repo: Optional[str] = None, path_glob: Optional[str] = None, min_risk: Optional[str] = None,
+                    since: Optional[str] = None, until: Optional[str] = None, limit: int = 100) -> List[Dict[str, Any]]:
+        """파일 단위 변경 이력 (최신순). path_glob 은 SQLite GLOB (예: 'src/api/*')"""
+        clauses, params = self._where(repo, since, until, "f")
+        if path_glob:
+            clauses.append("f.file_path GLOB ?"); params.append(path_glob)
+        if min_risk:
+            clauses.append("f.risk_rank >= ?"); params.append(_RISK_RANK.get(min_risk, 1))
+        sql = ("SELECT f.note_date, f.repo, f.sha, f.file_path, f.change_type, f.risk_level, f.summary, "
+               "f.breaking_changes, c.title, c.date_kst FROM files f JOIN commits c ON c.repo = f.repo AND c.sha = f.sha"
+               + (" WHERE " + " AND ".join(clauses) if clauses else "")
+               + " ORDER BY c.date_kst DESC, f.file_path LIMIT ?")
+        rows = self._select(sql, params + [limit])
+        for r in rows:
+            r["breaking_changes"] = json.loads(r["breaking_changes"] or "[]")
+        return rows
+
+    def query_commits(self, repo: Optional[str] = None, min_risk: Optional[str] = None, since: Optional[str] = None,
+                      until: Optional[str] = None, limit: int = 100) -> List[Dict[str, Any]]:
+        """커밋 단위 이력 (최신순)"""
+        clauses, params = self._where(repo, since, until)
+        if min_risk:
+            clauses.append("c.risk_rank >= ?"); params.append(_RISK_RANK.get(min_risk, 1))
+        sql = ("SELECT c.note_date, c.repo, c.sha, c.date_kst, c.title, c.overall_risk, c.overall_summary, c.file_count "
+               "FROM commits c" + (" WHERE " + " AND ".join(clauses) if clauses else "")
+               + " ORDER BY c.date_kst DESC LIMIT ?")
+        return self._select(sql, params + [limit])
+
+    def trend(self, period: str = "week", repo: Optional[str] = None, since: Optional[str] = None,
+              until: Optional[str] = None) -> List[Dict[str, Any]]:
+        """기간(day/week/month) × 레포별 커밋 수와 위험도 분포"""
+        col = {"day": "note_date", "week": "week", "month": "month"}[period]
+        clauses, params = self._where(repo, since, until)
+        sql = (f"SELECT c.{col} AS period, c.repo, COUNT(*) AS commits, SUM(c.file_count) AS files, "
+               "SUM(c.overall_risk = 'high') AS high, SUM(c.overall_risk = 'medium') AS medium, "
+               "SUM(c.overall_risk = 'low') AS low FROM commits c"
+               + (" WHERE " + " AND ".join(clauses) if clauses else "")
+               + f" GROUP BY c.{col}, c.repo ORDER BY period, c.repo")
+        return self._select(sql, params)
+
+    def top_files(self, since: str, until: str, repo: Optional[str] = None, limit: int = 10) -> List[Dict[str, Any]]:
+        """기간 내 가장 자주 바뀐 파일"""
+        clauses, params = self._where(repo, since, until, "f")
+        sql = ("SELECT f.repo, f.file_path, COUNT(*) AS changes, MAX(f.risk_rank) AS max_rank FROM files f WHERE "
+               + " AND ".join(clauses) + " GROUP BY f.repo, f.file_path ORDER BY changes DESC, max_rank DESC, f.file_path LIMIT ?")
+        return self._select(sql, params + [limit])
+
+    def breaking_changes(self, since: str, until: str, repo: Optional[str] = None) -> List[Dict[str, Any]]:
+        """기간 내 breaking change 가 기록된 파일 변경"""
+        clauses, params = self._where(repo, since, until, "f")
+        sql = ("SELECT f.note_date, f.repo, f.sha, f.file_path, f.breaking_changes FROM files f WHERE "
+               + " AND ".join(clauses + ["f.breaking_changes != '[]'"]) + " ORDER BY f.note_date, f.repo, f.file_path")
+        rows = self._select(sql, params)
+        for r in rows:
+            r["breaking_changes"] = json.loads(r["breaking_changes"])
+        return rows
+
+analytics_store = AnalyticsStore(ANALYTICS_DB) if ANALYTICS_INGEST else None
+
+def index_report(writer: "ReportWriter"):
+    """finalize 된 하루치 리포트를 분석 이력 저장소에 반영 (실패해도 리포트 생성은 계속)"""
+    if analytics_store is None:
+        return
+    try:
+        with profile.stage("analytics.ingest"):
+            analytics_store.ingest_file(writer.json_path, force=True)
+    except Exception as e:
+        log.warning(f"[STORE] ⚠️ Could not index {writer.json_path} into {analytics_store.path}: {e}")
+
 # ======================================
 # 🚀 8. 메인 실행
 # ======================================
-def main():
-    note_date, since_utc, until_utc = get_today_kst_bounds()
-    print(f"[INFO] Analyzing commits for {note_date} (KST)...")
-    print(f"[INFO] Time range: {since_utc} ~ {until_utc} (UTC)")
-    print(f"[INFO] Target repositories: {DEFAULT_REPOS}")
-    print(f"[INFO] Branch: {BRANCH}")
-    print(f"[INFO] Author filter: {MY_GITHUB_LOGIN} / {MY_GITHUB_EMAIL}")
-    print("=" * 60)
-
-    commits_all: List[CommitFinding] = []
-
-    for repo_full in DEFAULT_REPOS:
-        print(f"\n[REPO] Processing repository: {repo_full}")
-        try:
-            repo = gh.get_repo(repo_full)
-            print(f"[REPO] ✅ Successfully connected to {repo_full}")
+def process_commit(source, repo_full: str, ref: CommitRef, idx: int = 0, total: int = 1) -> Tuple[Optional[CommitFinding], bool]:
+    """커밋 1개 분석 (프로파일은 repo/sha 범위로 집계)"""
+    with profile_scope(repo=repo_full, sha=ref.sha), profile.stage("commit"):
+        return _process_commit(source, repo_full, ref, idx, total)
 
-            commits = repo.get_commits(sha=BRANCH, since=since_utc, until=until_utc)
-            commit_list = list(commits)
-            print(f"[REPO] 📊 Found {len(commit_list)} total commits in time range")
+def _prepare_commit(source, repo_full: str, ref: CommitRef, idx: int = 0,
+                    total: int = 1) -> Optional[Tuple[Dict[str, Any], List[Any], List[Optional[FileFinding]]]]:
+    """LLM 호출 전 단계: 메타데이터 + 파일 조회 + 분류 규칙 → (meta, 분석할 파일, 규칙으로 만든 FileFinding|None).
+    분석 대상 파일이 없으면 None"""
+    sha = ref.sha
+    log.info(f"[COMMIT] 🔍 Processing commit {sha[:7]} ({idx+1}/{total})")
 
-            my_commits_count = 0
+    # 메타데이터는 목록 응답(CommitRef)에서 가져오고, 커밋 상세는 파일/patch 에만 사용
+    authored_dt  = ref.authored_at.astimezone(tz.gettz("Asia/Seoul"))
+    meta = {
+        "repo": repo_full,
+        "sha": sha,
+        "title": ref.title,
+        "author": ref.author,
+        "author_login": ref.author_login,
+        "author_email": ref.author_email,
+        "date_kst": authored_dt.strftime("%Y-%m-%d %H:%M:%S %Z")
+    }
 
-            for i, c in enumerate(commit_list):
-                if not commit_is_mine(c):
-                    continue
+    log.info(f"[COMMIT] 📝 Title: {meta['title']}")
+    log.info(f"[COMMIT] 👤 Author: {meta['author']} ({meta['author_email']})")
+    log.info(f"[COMMIT] 📅 Date: {meta['date_kst']}")
 
-                # 커밋 단위 예외 처리(레포 전체 중단 방지)
-                try:
-                    sha = c.sha
-                    print(f"[COMMIT] 🔍 Processing commit {sha[:7]} ({i+1}/{len(commit_list)})")
-
-                    co = repo.get_commit(sha)
-                    title = co.commit.message.splitlines()[0].strip()
-                    author_name  = co.commit.author.name if co.commit.author else None
-                    author_login = co.author.login if co.author else None
-                    author_email = co.commit.author.email if co.commit.author else None
-                    authored_dt  = co.commit.author.date.replace(tzinfo=tz.UTC).astimezone(tz.gettz("Asia/Seoul"))
-                    date_kst_str = authored_dt.strftime("%Y-%m-%d %H:%M:%S %Z")
-
-                    print(f"[COMMIT] 📝 Title: {title}")
-                    print(f"[COMMIT] 👤 Author: {author_name} ({author_email})")
-                    print(f"[COMMIT] 📅 Date: {date_kst_str}")
-
-                    # 파일별 분석 (README 제외)
-                    important_files = [f for f in co.files if 'readme' not in f.filename.lower()]
-                    files_to_analyze = important_files
-                    print(f"[COMMIT] 📁 Analyzing {len(files_to_analyze)} files (out of {len(co.files)} total) - README excluded")
-
-                    if len(files_to_analyze) == 0:
-                        print(f"[COMMIT] ⏭️  Skipping commit (no files to analyze)")
-                        continue
+    if ref.changed_files == 0:
+        log.info(f"[COMMIT] ⏭️  Skipping commit (no changed files)")
+        return None
 
-                    file_findings: List[FileFinding] = []
-                    for j, f in enumerate(files_to_analyze):
-                        print(f"[FILE] 🔍 Analyzing file {j+1}/{len(files_to_analyze)}: {f.filename} ({f.status})")
-                        patch = getattr(f, "patch", None)
-                        if not patch:
-                            print(f"[FILE] ⚠️  No patch available for {f.filename} (binary or no diff)")
-                            file_findings.append(FileFinding(file_path=f.filename, change_type=f.status, summary="Binary or no diff", risk_level="medium"))
-                        else:
-                            print(f"[FILE] 🤖 Sending to LLM for analysis...")
-                            file_findings.append(analyze_file(f.filename, f.status, patch))
-                            print(f"[FILE] ✅ LLM analysis completed for {f.filename}")
-
-                    print(f"[COMMIT] 🤖 Sending commit summary to LLM...")
-                    meta = {
-                        "repo": repo_full,
-                        "sha": sha,
-                        "title": title,
-                        "author": author_name,
-                        "author_login": author_login,
-                        "author_email": author_email,
-                        "date_kst": date_kst_str
-                    }
-
-                    commit_finding = summarize_commit(file_findings, meta)
-                    commits_all.append(commit_finding)
-                    my_commits_count += 1
-                    print(f"[COMMIT] ✅ Completed analysis for {sha[:7]}")
-
-                except BadRequestError as e:
-                    msg = getattr(e, "message", str(e))
-                    print(f"[COMMIT] ❌ BadRequest on {c.sha[:7]}: {msg}")
-                    # 파일 분석은 끝났다면 Fallback으로라도 기록
-                    try:
-                        commit_finding = fallback_summarize_commit(file_findings, meta)  # type: ignore
-                        commits_all.append(commit_finding)
-                        my_commits_count += 1
-                        print(f"[COMMIT] 🔁 Fallback summary added for {c.sha[:7]}")
-                    except Exception as fe:
-                        print(f"[COMMIT] ⚠️ Fallback failed on {c.sha[:7]}: {fe}")
-                    continue
-                except Exception as e:
-                    print(f"[COMMIT] ❌ Error on {c.sha[:7]}: {e}")
-                    # 원하면 여기서도 fallback 시도 가능
-                    continue
+    # 파일별 분석 (분류 규칙으로 제외/LLM 없이 요약할 파일을 먼저 가려냄)
+    with profile.stage("source.get_files"):
+        all_files = source.get_files(sha)
+    with profile.stage("triage"):
+        triage = [(f, *triage_file(f)) for f in all_files]
+    kept = [(f, finding) for f, action, finding in triage if action != "exclude"]
+    files_to_analyze = [f for f, _ in kept]
+    triaged = sum(1 for _, finding in kept if finding is not None)
+    log.info(f"[COMMIT] 📁 Analyzing {len(files_to_analyze)} files (out of {len(all_files)} total) - "
+             f"{len(all_files) - len(kept)} excluded, {triaged} summarized by triage rules")
 
-            print(f"[REPO] 📊 Found {my_commits_count} of your commits in {repo_full}")
+    if len(files_to_analyze) == 0:
+        log.info(f"[COMMIT] ⏭️  Skipping commit (no files to analyze)")
+        return None
+    return meta, files_to_analyze, [finding for _, finding in kept]
 
-        except Exception as e:
-            print(f"[REPO] ❌ Error processing {repo_full}: {str(e)}")
-            print(f"[REPO] 🔄 Continuing with next repository...")
-            continue
+def _process_commit(source, repo_full: str, ref: CommitRef, idx: int = 0, total: int = 1) -> Tuple[Optional[CommitFinding], bool]:
+    """커밋 1개 분석 → (결과, 처리 완료 여부). 분석 대상 파일이 없으면 (None, True), 오류면 Fallback 또는 (None, False)"""
+    sha = ref.sha
+    file_findings: List[FileFinding] = []
+    meta = None
+    # 커밋 단위 예외 처리(레포 전체 중단 방지)
+    try:
+        prepared = _prepare_commit(source, repo_full, ref, idx, total)
+        if prepared is None:
+            return None, True
+        meta, files_to_analyze, triaged = prepared
+
+        # 파일 분석은 병렬로 수행하되 결과는 원래 파일 순서대로 모은다
+        file_findings = analyze_changed_files(files_to_analyze, triaged)
 
-    print(f"\n[SUMMARY] 📊 Analysis completed!")
-    print(f"[SUMMARY] 📈 Total commits analyzed: {len(commits_all)}")
-    print(f"[SUMMARY] 📝 Generating report...")
+        log.info(f"[COMMIT] 🤖 Sending commit summary to LLM...")
+        with profile.stage("summarize_commit"):
+            commit_finding = summarize_commit(file_findings, meta)
+        log.info(f"[COMMIT] ✅ Completed analysis for {sha[:7]}")
+        return commit_finding, True
 
-    report = ReportModel(
+    except BadRequestError as e:
+        msg = getattr(e, "message", str(e))
+        log.error(f"[COMMIT] ❌ BadRequest on {sha[:7]}: {msg}")
+        # 파일 분석은 끝났다면 Fallback으로라도 기록. 실제 파일 결과가 하나도 없으면 기록하지 않고 다음 실행에서 재시도
+        if not any(f.summary not in _FILE_FAILED_SUMMARIES for f in file_findings):
+            return None, False
+        try:
+            commit_finding = fallback_summarize_commit(file_findings, meta)  # type: ignore
+            log.info(f"[COMMIT] 🔁 Fallback summary added for {sha[:7]}")
+            return commit_finding, True
+        except Exception as fe:
+            log.warning(f"[COMMIT] ⚠️ Fallback failed on {sha[:7]}: {fe}")
+        return None, False
+    except Exception as e:
+        log.error(f"[COMMIT] ❌ Error on {sha[:7]}: {e}")
+        # 원하면 여기서도 fallback 시도 가능
+        return None, False
+
+def process_repo(repo_full: str, since_utc: dt.datetime, until_utc: dt.datetime,
+                 writer: ReportWriter, done_shas: Optional[set] = None) -> Tuple[int, bool]:
+    """리포지토리 1개 분석 (프로파일은 repo 범위로 집계)"""
+    with profile_scope(repo=repo_full), profile.stage("repo"):
+        return _process_repo(repo_full, since_utc, until_utc, writer, done_shas)
+
+def _list_new_commits(source, repo_full: str, since_utc: dt.datetime, until_utc: dt.datetime,
+                      done_shas: set) -> List[CommitRef]:
+    """기간 내 본인 커밋 목록 (이미 리포트에 있는 done_shas 는 호출하는 쪽에서 건너뜀).
+    목록은 항상 기간 시작부터 조회한다: PR 머지로 나중에 BRANCH 에 들어온 커밋은 커밋 시각이 예전 그대로라
+    마지막 처리 시각 이후만 조회하면 영영 빠지기 때문"""
+    with profile.stage("source.list_commits"):
+        commit_list = source.list_commits(since_utc, until_utc)
+    log.info(f"[REPO] 📊 Found {len(commit_list)} of your commits in time range")
+    if done_shas:
+        log.info(f"[REPO] ⏩ {sum(1 for c in commit_list if c.sha in done_shas)} already in the report, skipping")
+    return commit_list
+
+def _process_repo(repo_full: str, since_utc: dt.datetime, until_utc: dt.datetime,
+                  writer: ReportWriter, done_shas: Optional[set] = None) -> Tuple[int, bool]:
+    """리포지토리 1개의 기간 내 본인 커밋 분석, 완료된 커밋은 즉시 writer 에 기록 → (분석 커밋 수, 오류 없이 완료 여부)"""
+    log.info(f"[REPO] Processing repository: {repo_full}")
+    analyzed = 0
+    complete = False
+    done_shas = done_shas or set()
+    try:
+        source = make_commit_source(repo_full)
+        log.info(f"[REPO] ✅ Successfully connected to {repo_full} ({COMMIT_SOURCE})")
+
+        commit_list = _list_new_commits(source, repo_full, since_utc, until_utc, done_shas)
+
+        failed = set()
+        for i, c in enumerate(commit_list):
+            if c.sha in done_shas:
+                continue
+            commit_finding, ok = process_commit(source, repo_full, c, i, len(commit_list))
+            if commit_finding is not None:
+                writer.append(commit_finding)
+                analyzed += 1
+            if not ok:
+                failed.add(c.sha)
+
+        log.info(f"[REPO] 📊 Analyzed {analyzed} of your commits in {repo_full}")
+        complete = not failed
+
+    except Exception as e:
+        log.error(f"[REPO] ❌ Error processing {repo_full}: {str(e)}")
+        log.info(f"[REPO] 🔄 Continuing with next repository...")
+    return analyzed, complete
+
+def new_report_header(note_date: str) -> ReportModel:
+    """하루치 리포트 헤더 (커밋은 ReportWriter 가 JSONL 에서 채움)"""
+    return ReportModel(
         generated_at=dt.datetime.now(dt.timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC"),
         model=OPENAI_MODEL,
         note_date_kst=note_date,
         repos=DEFAULT_REPOS,
         branch=BRANCH,
         author_filter={"login": MY_GITHUB_LOGIN, "email": MY_GITHUB_EMAIL},
-        commits=commits_all
+        commits=[]
     )
 
-    md_path = os.path.join(OUT_DIR, f"research_note_{note_date.replace('-','')}.md")
-    json_path = os.path.join(OUT_DIR, f"research_note_{note_date.replace('-','')}.json")
+class _BatchCommit:
+    """Batch API 모드에서 커밋 1개의 진행 상태 (파일 결과 → 부분 요약 → 최종 결과)"""
+    def __init__(self, repo_full: str, ref: CommitRef, meta: Dict[str, Any], files: List[Any],
+                 triaged: List[Optional[FileFinding]]):
+        self.repo_full = repo_full
+        self.ref = ref
+        self.meta = meta
+        self.findings, self.llm_items, self.llm_index = _llm_inputs(files, triaged)
+        self.partials: Optional[List[Dict[str, Any]]] = None
+        self.result: Optional[CommitFinding] = None
+        self.error: Optional[Exception] = None
+
+    @property
+    def custom_id(self) -> str:
+        return f"{self.repo_full}@{self.ref.sha}"
+
+def _prepare_repo_batch(repo_full: str, since_utc: dt.datetime, until_utc: dt.datetime,
+                        done_shas: Optional[set]) -> Tuple[List[_BatchCommit], set]:
+    """Batch 1단계(레포 1개): 커밋 목록, 파일 조회, 분류 규칙까지 (LLM 호출 없음) → (분석할 커밋, 실패 SHA)"""
+    with profile_scope(repo=repo_full), profile.stage("repo"):
+        source = make_commit_source(repo_full)
+        done_shas = done_shas or set()
+        commit_list = _list_new_commits(source, repo_full, since_utc, until_utc, done_shas)
+        jobs: List[_BatchCommit] = []
+        failed = set()
+        for i, c in enumerate(commit_list):
+            if c.sha in done_shas:
+                continue
+            with profile_scope(sha=c.sha):
+                try:
+                    prepared = _prepare_commit(source, repo_full, c, i, len(commit_list))
+                    if prepared is not None:
+                        jobs.append(_BatchCommit(repo_full, c, *prepared))
+                except Exception as e:
+                    log.error(f"[COMMIT] ❌ Error on {c.sha[:7]}: {e}")
+                    failed.add(c.sha)
+        return jobs, failed
+
+def _batch_analyze_files(runner: BatchRunner, jobs: List[_BatchCommit]):
+    """Batch 2단계: 캐시에 없는 파일 분석을 한 배치로 요청 → FileFinding 으로 매핑.
+    같은 diff 는 요청 1개를 공유하고, 배치에서 실패/누락된 파일은 동기 호출로 보완"""
+    requests: Dict[str, List[Dict[str, str]]] = {}
+    models: Dict[str, str] = {}
+    owner_by_diff: Dict[str, str] = {}
+    pending: List[Tuple[_BatchCommit, int, Tuple[str, str, str], str, str]] = []
+    for job in jobs:
+        for j, item in zip(job.llm_index, job.llm_items):
+            path, change_type, patch = item
+            key = _file_cache_key(*item)
+            with profile_scope(repo=job.repo_full, sha=job.ref.sha, file=path):
+                cached = llm_cache.get(key) if llm_cache else None
+            if cached is not None:
+                job.findings[j] = FileFinding(**cached)
+                continue
+            custom_id = f"{job.custom_id}:{path}"
+            if dedup_index:
+                custom_id = owner_by_diff.setdefault(dedup_index.key(patch, MODEL_TIERS[route_file(path, patch)]), custom_id)
+            if custom_id not in requests:
+                requests[custom_id] = _file_messages(path, change_type, patch)
+                models[custom_id] = MODEL_TIERS[route_file(path, patch)]
+            pending.append((job, j, item, key, custom_id))
+    if not requests:
+        return
+    log.info(f"[BATCH] 🤖 {len(pending)} files → {len(requests)} batch requests")
+    contents = runner.run("files", requests, models)
+
+    def resolve(entry):
+        job, j, (path, change_type, patch), key, custom_id = entry
+        with profile_scope(repo=job.repo_full, sha=job.ref.sha, file=path):
+            try:
+                if custom_id not in contents:
+                    with profile.stage("analyze_file"):
+                        finding = _analyze_file_llm(path, change_type, patch)
+                else:
+                    finding = _parse_file_finding(contents[custom_id], path, change_type)
+                    if custom_id != f"{job.custom_id}:{path}":
+                        finding = dedup_index.reused(finding, path, change_type)
+            except Exception as e:
+                log.error(f"[FILE] ❌ Analysis failed for {path} in {job.ref.sha[:7]}: {e}")
+                job.error = e
+                return
+        _cache_file_finding(key, finding)
+        job.findings[j] = finding
+
+    parallel_map(resolve, pending, LLM_CONCURRENCY)
+
+def _batch_summarize(runner: BatchRunner, jobs: List[_BatchCommit]):
+    """Batch 3단계: 커밋 요약을 두 번째 배치로 (청크 요약 → 청크가 여러 개인 커밋만 단계별 트리 통합 배치).
+    실패/누락분은 동기 호출, 그래도 실패하면 로컬 Fallback 요약"""
+    plans: List[Tuple[_BatchCommit, str, List[List[Dict[str, Any]]]]] = []
+    chunk_requests: Dict[str, List[Dict[str, str]]] = {}
+    chunk_models: Dict[str, str] = {}
+    for job in jobs:
+        if job.error is not None:
+            continue
+        light_files = _lighten_files(job.findings)
+        key = _commit_cache_key(light_files)
+        with profile_scope(repo=job.repo_full, sha=job.ref.sha):
+            cached = llm_cache.get(key) if llm_cache else None
+        if cached is not None:
+            job.result = _commit_finding(job.findings, job.meta, cached)
+            continue
+        chunks = _summary_chunks(light_files)
+        for n, chunk in enumerate(chunks):
+            chunk_requests[f"{job.custom_id}#chunk{n}"] = _chunk_messages(job.meta, chunk)
+            chunk_models[f"{job.custom_id}#chunk{n}"] = MODEL_TIERS[_chunk_tier(chunk)]
+        plans.append((job, key, chunks))
+    contents = runner.run("summaries", chunk_requests, chunk_models) if chunk_requests else {}
+
+    def partials(plan):
+        job, _, chunks = plan
+        with profile_scope(repo=job.repo_full, sha=job.ref.sha):
+            try:
+                job.partials = [
+                    _parse_summary(contents[cid], _CHUNK_PARSE_FAILED) if cid in contents else _summarize_chunk(job.meta, chunk)
+                    for cid, chunk in ((f"{job.custom_id}#chunk{n}", chunk) for n, chunk in enumerate(chunks))
+                ]
+            except Exception as e:
+                log.error(f"[COMMIT] ❌ Unexpected error while summarizing {job.ref.sha[:7]}: {e}")
+
+    parallel_map(partials, plans, LLM_CONCURRENCY)
+
+    # 트리 통합: 단계마다 모든 커밋의 통합 묶음을 한 배치로
+    level = 0
+    while True:
+        merging = [job for job, _, _ in plans if job.partials and len(job.partials) > 1]
+        if not merging:
+            break
+        groups = {job.custom_id: _merge_groups(job.partials) for job in merging}
+        merge_groups = {
+            f"{job.custom_id}#merge{level}.{n}": g
+            for job in merging for n, g in enumerate(groups[job.custom_id]) if len(g) > 1
+        }
+        merged = runner.run(f"merges{level}", {cid: _merge_messages(g) for cid, g in merge_groups.items()},
+                            {cid: MODEL_TIERS[_merge_tier(g)] for cid, g in merge_groups.items()})
+
+        def reduce(job: _BatchCommit):
+            with profile_scope(repo=job.repo_full, sha=job.ref.sha):
+                try:
+                    job.partials = [
+                        g[0] if len(g) == 1 else
+                        _parse_merge(merged[cid], g) if cid in merged else _summarize_merge(g)
+                        for cid, g in ((f"{job.custom_id}#merge{level}.{n}", g) for n, g in enumerate(groups[job.custom_id]))
+                    ]
+                except Exception as e:
+                    log.error(f"[COMMIT] ❌ Unexpected error while summarizing {job.ref.sha[:7]}: {e}")
+                    job.partials = None
+
+        parallel_map(reduce, merging, LLM_CONCURRENCY)
+        level += 1
+
+    def finish(plan):
+        job, key, _ = plan
+        with profile_scope(repo=job.repo_full, sha=job.ref.sha):
+            try:
+                if job.partials is None:
+                    raise RuntimeError("chunk summaries unavailable")
+                final = job.partials[0]
+                _cache_commit_summary(key, final)
+                job.result = _commit_finding(job.findings, job.meta, final)
+            except Exception as e:
+                log.warning(f"[COMMIT] 🔁 Fallback summary for {job.ref.sha[:7]}: {e}")
+                job.result = fallback_summarize_commit(job.findings, job.meta)
+
+    parallel_map(finish, plans, LLM_CONCURRENCY)
+
+def process_repos_batch(since_utc: dt.datetime, until_utc: dt.datetime, writer: ReportWriter,
+                        done_by_repo: Dict[str, set], note_date: str) -> List[Tuple[int, bool]]:
+    """Batch API 모드: 모든 레포의 파일 분석을 한 배치로, 커밋 요약을 두 번째 배치로 처리 → 레포별 (분석 커밋 수, 완료 여부).
+    요청은 repo@sha:path 로 키를 잡아 OPENAI_BATCH_DIR/<날짜>/ 에 남기므로, 중단 후 재실행하면 받은 결과는 재사용하고 진행 중 배치는 이어서 기다린다"""
+    state_dir = os.path.join(OPENAI_BATCH_DIR, note_date.replace("-", ""))
+    runner = BatchRunner(oai, state_dir, OPENAI_BATCH_POLL_SECONDS, OPENAI_BATCH_MAX_WAIT_HOURS)
+
+    def prepare(repo_full: str):
+        try:
+            return _prepare_repo_batch(repo_full, since_utc, until_utc, done_by_repo.get(repo_full))
+        except Exception as e:
+            log.error(f"[REPO] ❌ Error processing {repo_full}: {str(e)}")
+            return None
+
+    prepared = parallel_map(prepare, DEFAULT_REPOS, REPO_CONCURRENCY)
+    jobs = [job for p in prepared if p for job in p[0]]
+    try:
+        _batch_analyze_files(runner, jobs)
+        _batch_summarize(runner, jobs)
+    except Exception as e:
+        # 제출/폴링 실패 또는 대기 시간 초과: 아무것도 기록하지 않고 종료 (다음 실행에서 이어서 폴링)
+        log.error(f"[BATCH] ❌ Batch run for {note_date} did not finish: {e}")
+        return [(0, False) for _ in DEFAULT_REPOS]
+
+    per_repo = []
+    for repo_full, p in zip(DEFAULT_REPOS, prepared):
+        if p is None:
+            per_repo.append((0, False))
+            continue
+        repo_jobs, failed = p
+        analyzed = 0
+        for job in repo_jobs:
+            if job.result is None:
+                failed.add(job.ref.sha)
+                continue
+            writer.append(job.result)
+            analyzed += 1
+        log.info(f"[REPO] 📊 Analyzed {analyzed} of your commits in {repo_full}")
+        per_repo.append((analyzed, not failed))
+    if all(ok for _, ok in per_repo):
+        shutil.rmtree(state_dir, ignore_errors=True)
+    return per_repo
+
+def run_day(day: dt.date, batch: bool = OPENAI_BATCH) -> int:
+    """KST 하루치 연구노트 생성 → 리포트에 포함된 전체 커밋 수"""
+    note_date, _, _ = get_kst_day_bounds(day)
+    with profile_scope(day=note_date):
+        return _run_day(day, batch)
+
+def _run_day(day: dt.date, batch: bool) -> int:
+    note_date, since_utc, until_utc = get_kst_day_bounds(day)
+    log.info(f"[INFO] Analyzing commits for {note_date} (KST)...")
+    log.info(f"[INFO] Time range: {since_utc} ~ {until_utc} (UTC)")
+
+    header = new_report_header(note_date)
+    writer = ReportWriter(header)
+    day_over = until_utc <= dt.datetime.now(dt.timezone.utc)
+
+    # 증분 실행: JSONL(없으면 기존 JSON)에 이미 기록된 커밋은 건너뜀 — 크래시 후 재실행도 같은 경로
+    if INCREMENTAL:
+        seeded = writer.seed_from_json()
+        if seeded:
+            log.info(f"[STATE] ♻️  Seeded {writer.jsonl_path} with {seeded} commits from {writer.json_path}")
+    else:
+        writer.reset()
+    # 중복 diff 절약 수는 리포트 단위 누적: 이전 실행 값에 이번 실행 분을 더함
+    prev_saved = int(writer.previous_header().get("dedup_saved_calls") or 0) if INCREMENTAL else 0
+    done_by_repo = writer.done_shas()
+    if done_by_repo:
+        log.info(f"[STATE] ♻️  Incremental run: {sum(len(v) for v in done_by_repo.values())} commits already in {writer.jsonl_path}")
+
+    if batch:
+        # Batch API: 수집 → 파일 분석 배치 → 커밋 요약 배치, 끝난 커밋을 모아서 기록
+        per_repo = process_repos_batch(since_utc, until_utc, writer, done_by_repo, note_date)
+    else:
+        # 리포지토리는 병렬로 수집, 완료된 커밋은 바로 JSONL/Markdown 에 추가
+        per_repo = parallel_map(
+            lambda r: process_repo(r, since_utc, until_utc, writer, done_by_repo.get(r)),
+            DEFAULT_REPOS, REPO_CONCURRENCY
+        )
+    new_count = sum(n for n, _ in per_repo)
+
+    log.info(f"[SUMMARY] 📊 Analysis completed for {note_date}!")
+    log.info(f"[SUMMARY] 📈 Total commits analyzed: {new_count} new")
+    run_saved = int(profile.counter("dedup_saved_calls", day=note_date))
+    header.dedup_saved_calls = prev_saved + run_saved
+    if run_saved:
+        log.info(f"[SUMMARY] ♻️  Identical diffs reused: {run_saved} file analyses saved "
+                 f"({header.dedup_saved_calls} for this report)")
+    log.info(f"[SUMMARY] 📝 Generating report...")
+
+    # JSONL → 레포별로 정렬된 최종 Markdown/JSON
+    log.info(f"[OUTPUT] 📄 Writing markdown report to: {writer.md_path}")
+    log.info(f"[OUTPUT] 📄 Writing JSON report to: {writer.json_path}")
+    with profile.stage("report.finalize"):
+        total = writer.finalize()
+    index_report(writer)
+
+    # 이미 지난 날짜를 모든 레포에서 오류 없이 끝냈으면 완료 표시 (백필에서 건너뜀)
+    if day_over and all(ok for _, ok in per_repo):
+        mark_day_complete(note_date, DEFAULT_REPOS, BRANCH)
+
+    log.info(f"✅ 연구노트 생성 완료! ({note_date})")
+    log.info(f"📁 Markdown: {writer.md_path}")
+    log.info(f"📁 JSON: {writer.json_path}")
+    log.info(f"📊 Total commits: {total}")
+    return total
+
+def _report_files_exist(day: dt.date) -> bool:
+    base = os.path.join(OUT_DIR, f"research_note_{day.strftime('%Y%m%d')}")
+    return os.path.exists(base + ".md") and os.path.exists(base + ".json")
+
+def run_range(since: dt.date, until: dt.date, backfill: bool = False,
+              day_concurrency: int = DAY_CONCURRENCY, batch: bool = OPENAI_BATCH) -> Dict[str, int]:
+    """기간 내 KST 날짜별로 research_note 한 쌍씩 생성 (날짜 병렬, GitHub/OpenAI 제한은 전역 공유).
+    backfill 이면 리포트가 있고 완료 표시된 날짜는 건너뜀 → {날짜: 커밋 수}"""
+    days = kst_days(since, until)
+    if backfill:
+        skipped = [d for d in days if _report_files_exist(d) and is_day_complete(d.isoformat(), DEFAULT_REPOS, BRANCH)]
+        if skipped:
+            log.info(f"[INFO] ⏭️  Skipping {len(skipped)} completed day(s): {', '.join(d.isoformat() for d in skipped)}")
+        days = [d for d in days if d not in skipped]
+    def _run(day: dt.date) -> int:
+        with profile.stage("day"):
+            return run_day(day, batch)
+    totals = parallel_map(_run, days, day_concurrency)
+    return {d.isoformat(): n for d, n in zip(days, totals)}
+
+def _parse_date(value: str) -> dt.date:
+    try:
+        return dt.date.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"날짜 형식은 YYYY-MM-DD 입니다: {value}")
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="GitHub 커밋 분석 연구노트 생성기")
+    parser.add_argument("--since", type=_parse_date, help="시작 날짜(KST, YYYY-MM-DD, 기본: 오늘)")
+    parser.add_argument("--until", type=_parse_date, help="끝 날짜(KST, 포함, 기본: --since 또는 오늘)")
+    parser.add_argument("--backfill", action="store_true", help="이미 완료된 날짜는 건너뛰고 누락된 날짜만 생성")
+    parser.add_argument("--day-concurrency", type=int, default=DAY_CONCURRENCY, help="동시에 처리할 날짜 수")
+    parser.add_argument("--batch", action="store_true", default=OPENAI_BATCH,
+                        help="OpenAI Batch API 로 분석 (저렴하지만 최대 24시간 소요, 야간 실행용)")
+    args = parser.parse_args(argv)
+    until = args.until or dt.datetime.now(tz=KST).date()
+    since = args.since or until
+    if since > until:
+        parser.error(f"--since ({since}) must not be after --until ({until})")
+    logging.basicConfig(level=getattr(logging, LOG_LEVEL.upper(), logging.INFO),
+                        format="%(asctime)s %(levelname)-7s %(message)s")
+
+    log.info(f"[INFO] Date range: {since} ~ {until} (KST){' [backfill]' if args.backfill else ''}{' [batch]' if args.batch else ''}")
+    log.info(f"[INFO] Target repositories: {DEFAULT_REPOS}")
+    log.info(f"[INFO] Branch: {BRANCH}")
+    log.info(f"[INFO] Author filter: {MY_GITHUB_LOGIN} / {MY_GITHUB_EMAIL}")
+    if llm_cache:
+        evicted = llm_cache.evict()
+        log.info(f"[CACHE] 💾 Using {CACHE_PATH} (evicted {evicted} stale entries)")
+    log.info("=" * 60)
+
+    profile.meta.update({
+        "date_range": [since.isoformat(), until.isoformat()],
+        "backfill": args.backfill,
+        "batch": args.batch,
+        "repos": DEFAULT_REPOS,
+        "model": OPENAI_MODEL,
+        "model_tiers": MODEL_TIERS if ROUTING_ENABLED else None,
+        "commit_source": COMMIT_SOURCE
+    })
+    rate_start = _github_remaining()
 
-    print(f"[OUTPUT] 📄 Writing markdown report to: {md_path}")
-    with open(md_path, "w", encoding="utf-8") as f:
-        f.write(render_md(report))
+    totals = run_range(since, until, backfill=args.backfill, day_concurrency=args.day_concurrency, batch=args.batch)
 
-    print(f"[OUTPUT] 📄 Writing JSON report to: {json_path}")
-    with open(json_path, "w", encoding="utf-8") as f:
-        f.write(json.dumps(report.to_dict(), indent=2, ensure_ascii=False))
+    profile.meta["days"] = totals
+    rate_end = _github_remaining()
+    if rate_start is not None and rate_end is not None:
+        # 리셋 창이 바뀌면 음수가 될 수 있어 참고용
+        profile.meta["github_rate_limit"] = {"start_remaining": rate_start, "end_remaining": rate_end, "used": rate_start - rate_end}
 
-    print(f"\n✅ 연구노트 생성 완료!")
-    print(f"📁 Markdown: {md_path}")
-    print(f"📁 JSON: {json_path}")
-    print(f"📊 Total commits: {len(commits_all)}")
+    if len(totals) > 1:
+        log.info(f"[SUMMARY] 📅 {len(totals)} day(s): " + ", ".join(f"{d}={n}" for d, n in totals.items()))
+    if llm_cache:
+        log.info(f"[SUMMARY] 💾 LLM cache: {llm_cache.stats()}")
+    if dedup_index:
+        log.info(f"[SUMMARY] ♻️  Duplicate diffs: {dedup_index.saved} file analyses saved")
+    counters = profile.to_dict()["totals"]["counters"]
+    log.info(f"[SUMMARY] ⏱️  OpenAI calls={counters.get('openai_calls', 0)}, retries={counters.get('openai_retries', 0)}, "
+             f"tokens={counters.get('prompt_tokens', 0)}+{counters.get('completion_tokens', 0)}, "
+             f"cost≈${counters.get('cost_usd', 0):.4f}, GitHub calls={counters.get('github_calls', 0)}")
+    profile.write(PROFILE_PATH)
+    log.info(f"[OUTPUT] 📄 Run profile: {PROFILE_PATH}")
 
 if __name__ == "__main__":
     main()
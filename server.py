@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+상주 실행(웹훅) 모드: GitHub push 웹훅을 받아 (repo, sha) 작업을 SQLite 큐에 넣고,
+워커 풀이 main.py 의 클라이언트(gh/oai)와 분석 파이프라인을 그대로 재사용해 처리한다.
+커밋이 끝날 때마다 그날의 research_note_YYYYMMDD.jsonl/.md/.json 이 갱신된다.
+
+    python server.py                                   # WEBHOOK_PORT 에서 대기
+    python server.py --replay fixtures/push.sample.json  # 저장된 payload 재생 → 큐 비우고 종료
+"""
+
+import os, hmac, json, time, signal, sqlite3, hashlib, argparse, logging, threading, datetime as dt
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional, Dict, Any, Tuple
+
+import main
+from main import log
+
+# ======================================
+# 🔧 1. 설정
+# ======================================
+WEBHOOK_HOST       = os.getenv("WEBHOOK_HOST", "0.0.0.0")
+WEBHOOK_PORT       = int(os.getenv("WEBHOOK_PORT", "8080"))
+WEBHOOK_SECRET     = os.getenv("WEBHOOK_SECRET", "")                                          # GitHub 웹훅 Secret (X-Hub-Signature-256 검증)
+QUEUE_PATH         = os.getenv("QUEUE_PATH", os.path.join(main.OUT_DIR, ".queue", "jobs.sqlite3"))
+WORKER_CONCURRENCY = int(os.getenv("WORKER_CONCURRENCY", "2"))                                # 동시에 처리할 커밋 수
+JOB_MAX_ATTEMPTS   = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))                                  # 실패 시 재시도 포함 최대 시도 횟수
+JOB_RETRY_SECONDS  = float(os.getenv("JOB_RETRY_SECONDS", "30"))                              # 재시도 대기 (시도마다 2배)
+LOCAL_HOSTS        = ("127.0.0.1", "::1", "localhost")                                        # Secret 없이도 대기 가능한 주소
+
+# ======================================
+# 📬 2. 작업 큐 (SQLite, 재시작해도 유지)
+# ======================================
+class JobQueue:
+    """(repo, sha) 단위 영구 작업 큐. 같은 커밋은 한 번만 들어가고, 처리 중 종료된 작업은 재시작 시 다시 대기열로"""
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "repo TEXT, sha TEXT, payload TEXT, status TEXT, attempts INTEGER DEFAULT 0, error TEXT, "
+            "not_before REAL DEFAULT 0, created_at REAL, updated_at REAL, PRIMARY KEY (repo, sha))"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status, not_before, created_at)")
+        self._db.commit()
+        self.ready = threading.Event()
+
+    def recover(self) -> int:
+        """이전 프로세스에서 처리 중이던 작업을 다시 대기열로"""
+        with self._lock:
+            n = self._db.execute("UPDATE jobs SET status = 'queued' WHERE status = 'running'").rowcount
+            self._db.commit()
+        if n:
+            self.ready.set()
+        return n
+
+    def enqueue(self, repo: str, sha: str, payload: Dict[str, Any]) -> bool:
+        now = time.time()
+        with self._lock:
+            added = self._db.execute(
+                "INSERT OR IGNORE INTO jobs (repo, sha, payload, status, created_at, updated_at) VALUES (?, ?, ?, 'queued', ?, ?)",
+                (repo, sha, json.dumps(payload, ensure_ascii=False), now, now)
+            ).rowcount
+            self._db.commit()
+        if added:
+            self.ready.set()
+        return bool(added)
+
+    def claim(self) -> Optional[Tuple[str, str, Dict[str, Any], int]]:
+        """가장 오래된 대기 작업 1개를 running 으로 → (repo, sha, payload, 시도 횟수)"""
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT repo, sha, payload, attempts FROM jobs WHERE status = 'queued' AND not_before <= ? "
+                "ORDER BY created_at LIMIT 1", (now,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._db.execute("UPDATE jobs SET status = 'running', attempts = attempts + 1, updated_at = ? "
+                             "WHERE repo = ? AND sha = ?", (now, row[0], row[1]))
+            self._db.commit()
+        return row[0], row[1], json.loads(row[2]), row[3] + 1
+
+    def finish(self, repo: str, sha: str, error: Optional[str] = None, attempts: int = 0):
+        """성공이면 done, 실패면 시도 횟수가 남았을 때 지수 대기 후 재시도, 아니면 failed"""
+        now = time.time()
+        if error is None:
+            status, not_before = "done", 0.0
+        elif attempts < JOB_MAX_ATTEMPTS:
+            status, not_before = "queued", now + JOB_RETRY_SECONDS * (2 ** (attempts - 1))
+        else:
+            status, not_before = "failed", 0.0
+        with self._lock:
+            self._db.execute("UPDATE jobs SET status = ?, error = ?, not_before = ?, updated_at = ? WHERE repo = ? AND sha = ?",
+                             (status, error, not_before, now, repo, sha))
+            self._db.commit()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._db.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return {status: n for status, n in rows}
+
+    def pending(self) -> int:
+        """대기/처리 중 작업 수 (재시도 대기 포함)"""
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM jobs WHERE status IN ('queued', 'running')").fetchone()[0]
+
+# ======================================
+# 🪝 3. 웹훅 payload → 작업
+# ======================================
+def verify_signature(body: bytes, signature: Optional[str], secret: Optional[str] = None) -> bool:
+    """X-Hub-Signature-256 검증 (Secret 미설정이면 검증 생략)"""
+    secret = WEBHOOK_SECRET if secret is None else secret
+    if not secret:
+        return True
+    expected = "sha256=" + hmac.new(secret.encode("utf-8"), body, hashlib.sha256).hexdigest()
+    return bool(signature) and hmac.compare_digest(expected, signature)
+
+def commits_from_push(payload: Dict[str, Any]) -> List[Tuple[str, Dict[str, Any]]]:
+    """push 이벤트에서 분석할 (repo, commit) 목록: 대상 레포/브랜치의 본인 커밋만"""
+    repo_full = (payload.get("repository") or {}).get("full_name")
+    if repo_full not in main.DEFAULT_REPOS or payload.get("ref") != f"refs/heads/{main.BRANCH}" or payload.get("deleted"):
+        return []
+    jobs = []
+    for c in payload.get("commits") or []:
+        author = c.get("author") or {}
+        if main._is_mine(author.get("username"), author.get("email")) or main._is_mine_local(author.get("name"), author.get("email")):
+            jobs.append((repo_full, c))
+    return jobs
+
+def ref_from_push_commit(c: Dict[str, Any]) -> main.CommitRef:
+    """push payload 의 커밋 → CommitRef (payload 에는 작성/커밋 시각 구분이 없어 timestamp 를 둘 다에 사용)"""
+    author = c.get("author") or {}
+    ts = main._as_utc(dt.datetime.fromisoformat(c["timestamp"].replace("Z", "+00:00")))
+    changed = sum(len(c.get(k) or []) for k in ("added", "removed", "modified"))
+    return main.CommitRef(
+        sha=c["id"], title=(c.get("message") or "").split("\n", 1)[0], author=author.get("name"),
+        author_login=author.get("username"), author_email=author.get("email"),
+        authored_at=ts, committed_at=ts, changed_files=changed or None
+    )
+
+# ======================================
+# 🧵 4. 워커 풀 & 리포트 갱신
+# ======================================
+class Service:
+    """큐 + 워커 풀. gh/oai 클라이언트, LLM 캐시, 동시성/Rate limit 은 main 모듈의 것을 공유"""
+    def __init__(self, queue: JobQueue, workers: int = WORKER_CONCURRENCY):
+        self.queue = queue
+        self.workers = workers
+        self.stopping = threading.Event()
+        self._locks: Dict[str, threading.Lock] = {}    # "day:YYYY-MM-DD" / "repo:owner/name"
+        self._locks_guard = threading.Lock()
+        self._busy = 0
+        self._busy_lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+
+    def handle_event(self, event: str, payload: Dict[str, Any]) -> int:
+        """웹훅 이벤트 1개 처리 → 새로 큐에 넣은 커밋 수"""
+        if event != "push":
+            return 0
+        added = 0
+        for repo_full, c in commits_from_push(payload):
+            if self.queue.enqueue(repo_full, c["id"], c):
+                added += 1
+                log.info(f"[QUEUE] 📥 {repo_full}@{c['id'][:7]} queued")
+        return added
+
+    def _lock_for(self, key: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def process(self, repo_full: str, payload: Dict[str, Any]) -> bool:
+        """커밋 1개 분석 → 그날 리포트(JSONL 추가 + JSON/MD 재조립). 재시도가 필요하면 False.
+        같은 날짜 리포트 파일은 day 잠금 안에서만 건드림 (LLM 분석은 잠금 밖에서 병렬)"""
+        ref = ref_from_push_commit(payload)
+        note_date = ref.committed_at.astimezone(main.KST).date().isoformat()
+        day_lock = self._lock_for(f"day:{note_date}")
+        with main.profile_scope(day=note_date):
+            with day_lock:
+                writer = main.ReportWriter(main.new_report_header(note_date), main.OUT_DIR)
+                writer.seed_from_json()
+                done = ref.sha in writer.done_shas().get(repo_full, set())
+            if done:
+                log.info(f"[QUEUE] ⏭️  {repo_full}@{ref.sha[:7]} already in {writer.jsonl_path}")
+                return True
+
+            source = main.make_commit_source(repo_full)
+            if hasattr(source, "sync"):
+                # 같은 미러에 동시에 fetch 하지 않도록 레포별로 직렬화 (작업마다 새로 fetch 해서 push 된 커밋 반영)
+                with self._lock_for(f"repo:{repo_full}"):
+                    source.sync()
+            commit_key = f"{repo_full}@{ref.sha}"
+            saved_before = main.profile.counter("dedup_saved_calls", commit=commit_key)
+            finding, ok = main.process_commit(source, repo_full, ref)
+            if finding is not None:
+                saved = int(main.profile.counter("dedup_saved_calls", commit=commit_key) - saved_before)
+                with day_lock:
+                    writer.append(finding)
+                    # 리포트 단위 누적: 직전 finalize 결과(다른 워커/실행 분 포함)에 이 커밋 분만 더함
+                    writer.header.dedup_saved_calls = int(writer.previous_header().get("dedup_saved_calls") or 0) + saved
+                    with main.profile.stage("report.finalize"):
+                        total = writer.finalize()
+                    main.index_report(writer)
+                log.info(f"[OUTPUT] 📄 {writer.md_path} updated ({total} commits)")
+        return ok
+
+    def _worker(self):
+        while not self.stopping.is_set():
+            job = self.queue.claim()
+            if job is None:
+                self.queue.ready.clear()
+                self.queue.ready.wait(timeout=1.0)
+                continue
+            repo_full, sha, payload, attempts = job
+            with self._busy_lock:
+                self._busy += 1
+            error = None
+            try:
+                if not self.process(repo_full, payload):
+                    error = "analysis failed"
+            except Exception as e:
+                error = str(e)
+                log.error(f"[QUEUE] ❌ {repo_full}@{sha[:7]}: {e}")
+            finally:
+                self.queue.finish(repo_full, sha, error, attempts)
+                with self._busy_lock:
+                    self._busy -= 1
+                    idle = self._busy == 0
+                if idle and self.queue.pending() == 0:
+                    self._flush()
+
+    def _flush(self):
+        """큐가 비면 그동안의 프로파일을 기록하고, 상주 프로세스 메모리가 늘지 않도록 프로파일/중복 인덱스를 새로 시작"""
+        main.profile.write(main.PROFILE_PATH)
+        main.profile = main.RunProfile()
+        main.profile.meta.update({"mode": "server", "repos": main.DEFAULT_REPOS, "model": main.OPENAI_MODEL})
+        if main.dedup_index:
+            main.dedup_index = main.DedupIndex(main.DEDUP_IGNORE_LINE_NUMBERS)
+
+    def start(self):
+        recovered = self.queue.recover()
+        if recovered:
+            log.info(f"[QUEUE] ♻️  Re-queued {recovered} job(s) interrupted by the previous run")
+        for i in range(self.workers):
+            t = threading.Thread(target=self._worker, name=f"worker-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def drain(self):
+        """대기/재시도 작업이 모두 끝날 때까지 대기 (--replay 용)"""
+        while self.queue.pending():
+            time.sleep(0.2)
+
+    def stop(self):
+        self.stopping.set()
+        self.queue.ready.set()
+        for t in self._threads:
+            t.join()
+
+# ======================================
+# 🌐 5. HTTP
+# ======================================
+def make_handler(service: Service):
+    class WebhookHandler(BaseHTTPRequestHandler):
+        def _reply(self, code: int, body: Dict[str, Any]):
+            data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path == "/healthz":
+                self._reply(200, {"status": "ok", "jobs": service.queue.stats()})
+            else:
+                self._reply(404, {"error": "not found"})
+
+        def do_POST(self):
+            if self.path != "/webhook":
+                self._reply(404, {"error": "not found"})
+                return
+            body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            if not verify_signature(body, self.headers.get("X-Hub-Signature-256")):
+                log.warning(f"[WEBHOOK] 🚫 Invalid signature from {self.client_address[0]}")
+                self._reply(401, {"error": "invalid signature"})
+                return
+            try:
+                payload = json.loads(body or b"{}")
+            except ValueError:
+                self._reply(400, {"error": "invalid JSON"})
+                return
+            event = self.headers.get("X-GitHub-Event", "")
+            queued = service.handle_event(event, payload)
+            self._reply(202, {"event": event, "queued": queued})
+
+        def log_message(self, fmt, *args):
+            log.debug(f"[WEBHOOK] {self.address_string()} {fmt % args}")
+
+    return WebhookHandler
+
+def main_cli(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="연구노트 상주 실행(웹훅) 모드")
+    parser.add_argument("--host", default=WEBHOOK_HOST)
+    parser.add_argument("--port", type=int, default=WEBHOOK_PORT)
+    parser.add_argument("--workers", type=int, default=WORKER_CONCURRENCY, help="동시에 처리할 커밋 수")
+    parser.add_argument("--replay", nargs="+", metavar="PAYLOAD_JSON",
+                        help="저장된 push payload 파일을 순서대로 재생하고 큐를 비운 뒤 종료 (서버를 띄우지 않음)")
+    parser.add_argument("--insecure", action="store_true",
+                        help="WEBHOOK_SECRET 없이 외부 주소에서 대기 허용 (서명 미검증: 누구나 LLM 분석 작업을 넣을 수 있음)")
+    parser.add_argument("--repo", metavar="OWNER/NAME",
+                        help="--replay 시 payload 의 repository.full_name 을 이 레포로 바꿔 재생 (DEFAULT_REPOS 중 하나)")
+    args = parser.parse_args(argv)
+    if args.repo and args.repo not in main.DEFAULT_REPOS:
+        parser.error(f"--repo must be one of DEFAULT_REPOS: {', '.join(main.DEFAULT_REPOS)}")
+    # 서명 검증 없이 외부에 열면 포트에 닿는 누구나 유료 LLM 작업과 리포트 내용(message/author)을 넣을 수 있음
+    if not args.replay and not WEBHOOK_SECRET and args.host not in LOCAL_HOSTS and not args.insecure:
+        parser.error(f"WEBHOOK_SECRET is not set; refusing to listen on {args.host}. "
+                     f"Set WEBHOOK_SECRET, bind to 127.0.0.1 (--host), or pass --insecure")
+    logging.basicConfig(level=getattr(logging, main.LOG_LEVEL.upper(), logging.INFO),
+                        format="%(asctime)s %(levelname)-7s %(message)s")
+
+    if main.llm_cache:
+        main.llm_cache.evict()
+    main.profile.meta.update({"mode": "server", "repos": main.DEFAULT_REPOS, "model": main.OPENAI_MODEL})
+    service = Service(JobQueue(QUEUE_PATH), args.workers)
+    service.start()
+
+    if args.replay:
+        for path in args.replay:
+            with open(path, "r", encoding="utf-8") as f:
+                payload = json.load(f)
+            if args.repo:
+                payload.setdefault("repository", {})["full_name"] = args.repo
+            queued = service.handle_event("push", payload)
+            log.info(f"[REPLAY] ▶️  {path}: {queued} commit(s) queued")
+            if not queued:
+                log.warning(f"[REPLAY] ⚠️  Nothing queued: repo must be in DEFAULT_REPOS, ref must be refs/heads/{main.BRANCH}, "
+                            f"and commit authors must match MY_GITHUB_LOGIN/MY_GITHUB_EMAIL")
+        service.drain()
+        service.stop()
+        log.info(f"[REPLAY] ✅ Done: {service.queue.stats()}")
+        return
+
+    if not WEBHOOK_SECRET:
+        log.warning(f"[WEBHOOK] ⚠️  WEBHOOK_SECRET is not set; signatures are not verified"
+                    f"{' (--insecure)' if args.insecure else ''}")
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(service))
+    # SIGTERM 도 Ctrl+C 와 같이 정리 (진행 중인 커밋은 마치고 종료)
+    signal.signal(signal.SIGTERM, lambda *_: threading.Thread(target=server.shutdown).start())
+    log.info(f"[WEBHOOK] 🌐 Listening on http://{args.host}:{args.port}/webhook ({args.workers} workers)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.stop()
+        main.profile.write(main.PROFILE_PATH)
+        log.info(f"[WEBHOOK] 👋 Stopped: {service.queue.stats()}")
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+분석 이력 저장소 CLI: 날짜별 research_note_*.json 을 SQLite(ANALYTICS_DB)에 색인해 두고
+여러 날짜에 걸친 조회, 위험도 추이, 주간/월간 롤업 리포트를 파일 재스캔 없이 만든다.
+
+    python store.py import                                   # OUT_DIR 의 기존 리포트 일괄 색인
+    python store.py query --path 'src/api/*' --risk high --since 2025-01-01
+    python store.py trend --by month --repo owner/name
+    python store.py rollup --period week --date 2025-01-15   # rollup_2025-W03.md/.json
+"""
+
+import os, sys, glob, json, argparse, logging, datetime as dt
+from typing import List, Optional, Dict, Any, Tuple
+
+import main
+from main import log, AnalyticsStore
+
+# ======================================
+# 📅 1. 기간 계산
+# ======================================
+def period_bounds(period: str, day: dt.date) -> Tuple[str, dt.date, dt.date]:
+    """day 가 속한 ISO 주(월~일) 또는 월 → (라벨, 시작일, 끝일)"""
+    if period == "week":
+        start = day - dt.timedelta(days=day.weekday())
+        year, week, _ = day.isocalendar()
+        return f"{year}-W{week:02d}", start, start + dt.timedelta(days=6)
+    start = day.replace(day=1)
+    end = (start + dt.timedelta(days=32)).replace(day=1) - dt.timedelta(days=1)
+    return start.strftime("%Y-%m"), start, end
+
+def _previous_period_day(period: str, today: dt.date) -> dt.date:
+    """기본 롤업 대상: 지난주/지난달"""
+    if period == "week":
+        return today - dt.timedelta(days=7)
+    return today.replace(day=1) - dt.timedelta(days=1)
+
+# ======================================
+# 📊 2. 롤업 리포트 (색인 조회로만 구성)
+# ======================================
+def build_rollup(store: AnalyticsStore, period: str, day: dt.date, repo: Optional[str] = None) -> Dict[str, Any]:
+    label, start, end = period_bounds(period, day)
+    since, until = start.isoformat(), end.isoformat()
+    per_repo: Dict[str, Dict[str, int]] = {}
+    for r in store.trend("day", repo, since, until):
+        agg = per_repo.setdefault(r["repo"], {"commits": 0, "files": 0, "high": 0, "medium": 0, "low": 0, "active_days": 0})
+        for k in ("commits", "files", "high", "medium", "low"):
+            agg[k] += r[k] or 0
+        agg["active_days"] += 1
+    return {
+        "period": period,
+        "label": label,
+        "since": since,
+        "until": until,
+        "repos": per_repo,
+        "high_risk_commits": store.query_commits(repo, "high", since, until, limit=1000),
+        "top_files": store.top_files(since, until, repo),
+        "breaking_changes": store.breaking_changes(since, until, repo),
+    }
+
+def render_rollup_md(r: Dict[str, Any]) -> str:
+    title = "주간" if r["period"] == "week" else "월간"
+    lines = [
+        f"# 📊 {title} 연구노트 롤업 — {r['label']}",
+        "",
+        f"- 기간: {r['since']} ~ {r['until']} (KST)",
+        f"- 커밋: {sum(v['commits'] for v in r['repos'].values())}개, 레포 {len(r['repos'])}개",
+        "",
+        "## 📦 레포별 요약",
+        "",
+    ]
+    if not r["repos"]:
+        lines.append("> 이 기간에는 본인 커밋이 없습니다.")
+    else:
+        lines += ["| 레포 | 커밋 | 파일 | 🔴 high | 🟡 medium | 🟢 low | 활동일 |", "|---|---|---|---|---|---|---|"]
+        for name, v in r["repos"].items():
+            lines.append(f"| {name} | {v['commits']} | {v['files']} | {v['high']} | {v['medium']} | {v['low']} | {v['active_days']} |")
+    lines.append("")
+
+    if r["high_risk_commits"]:
+        lines += ["## ⚠️ 고위험 커밋", ""]
+        for c in r["high_risk_commits"]:
+            lines.append(f"- [{c['sha'][:7]}](https://github.com/{c['repo']}/commit/{c['sha']}) {c['date_kst']} · "
+                         f"{c['repo']} — {c['title']}")
+            if c["overall_summary"]:
+                lines.append(f"  - {c['overall_summary']}")
+        lines.append("")
+
+    if r["top_files"]:
+        lines += ["## 🔥 자주 바뀐 파일", ""]
+        for f in r["top_files"]:
+            lines.append(f"- `{f['file_path']}` ({f['repo']}) — {f['changes']}회")
+        lines.append("")
+
+    if r["breaking_changes"]:
+        lines += ["## 💥 Breaking changes", ""]
+        for b in r["breaking_changes"]:
+            for item in b["breaking_changes"]:
+                lines.append(f"- {b['note_date']} `{b['file_path']}` ({b['repo']}@{b['sha'][:7]}): {item}")
+        lines.append("")
+    return "\n".join(lines)
+
+# ======================================
+# 🖥️ 3. CLI
+# ======================================
+def _print_rows(rows: List[Dict[str, Any]], as_json: bool, fmt):
+    if as_json:
+        for row in rows:
+            print(json.dumps(row, ensure_ascii=False))
+        return
+    for row in rows:
+        print(fmt(row))
+    print(f"({len(rows)} rows)", file=sys.stderr)
+
+def cmd_import(store: AnalyticsStore, args) -> int:
+    paths = args.paths or sorted(glob.glob(os.path.join(main.OUT_DIR, "research_note_*.json")))
+    indexed = skipped = commits = 0
+    for path in paths:
+        try:
+            n = store.ingest_file(path, force=args.force)
+        except (OSError, ValueError, KeyError) as e:
+            log.warning(f"[STORE] ⚠️ Skipping {path}: {e}")
+            continue
+        if n is None:
+            skipped += 1
+        else:
+            indexed += 1
+            commits += n
+    log.info(f"[STORE] 📥 Indexed {indexed} report(s), {commits} commits → {store.path} ({skipped} unchanged)")
+    return 0
+
+def cmd_query(store: AnalyticsStore, args) -> int:
+    if args.commits:
+        rows = store.query_commits(args.repo, args.risk, args.since, args.until, args.limit)
+        _print_rows(rows, args.json, lambda r: f"{r['date_kst'][:16]}  {r['overall_risk']:<6}  {r['repo']}@{r['sha'][:7]}  {r['title']}")
+    else:
+        rows = store.query_files(args.repo, args.path, args.risk, args.since, args.until, args.limit)
+        _print_rows(rows, args.json, lambda r: f"{r['date_kst'][:16]}  {r['risk_level']:<6}  {r['repo']}@{r['sha'][:7]}  "
+                                               f"{r['file_path']} — {r['summary']}")
+    return 0
+
+def cmd_trend(store: AnalyticsStore, args) -> int:
+    rows = store.trend(args.by, args.repo, args.since, args.until)
+    _print_rows(rows, args.json, lambda r: f"{r['period']:<10}  {r['repo']:<40}  commits={r['commits']:<4} files={r['files'] or 0:<5} "
+                                           f"high={r['high']} medium={r['medium']} low={r['low']}")
+    return 0
+
+def cmd_rollup(store: AnalyticsStore, args) -> int:
+    day = args.date or _previous_period_day(args.period, dt.datetime.now(main.KST).date())
+    rollup = build_rollup(store, args.period, day, args.repo)
+    base = os.path.join(args.out_dir, f"rollup_{rollup['label']}")
+    with open(base + ".json", "w", encoding="utf-8") as f:
+        json.dump(rollup, f, indent=2, ensure_ascii=False)
+    with open(base + ".md", "w", encoding="utf-8") as f:
+        f.write(render_rollup_md(rollup))
+    log.info(f"[STORE] 📄 Rollup {rollup['label']} ({rollup['since']} ~ {rollup['until']}) → {base}.md / .json")
+    return 0
+
+def main_cli(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="연구노트 분석 이력 저장소 (SQLite)")
+    parser.add_argument("--db", default=main.ANALYTICS_DB, help="저장소 경로 (기본: ANALYTICS_DB)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("import", help="research_note_*.json 일괄 색인 (기본: OUT_DIR 전체)")
+    p.add_argument("paths", nargs="*")
+    p.add_argument("--force", action="store_true", help="바뀌지 않은 리포트도 다시 색인")
+
+    def _filters(p, risk_help):
+        p.add_argument("--repo")
+        p.add_argument("--since", type=main._parse_date, help="시작 날짜(KST, YYYY-MM-DD)")
+        p.add_argument("--until", type=main._parse_date, help="끝 날짜(KST, 포함)")
+        p.add_argument("--json", action="store_true", help="JSON Lines 로 출력")
+        if risk_help:
+            p.add_argument("--risk", choices=["low", "medium", "high"], help=risk_help)
+
+    p = sub.add_parser("query", help="파일/커밋 변경 이력 조회 (최신순)")
+    _filters(p, "이 위험도 이상만")
+    p.add_argument("--path", help="파일 경로 GLOB (예: 'src/api/*')")
+    p.add_argument("--commits", action="store_true", help="파일 대신 커밋 단위로 조회")
+    p.add_argument("--limit", type=int, default=100)
+
+    p = sub.add_parser("trend", help="기간별 × 레포별 커밋 수와 위험도 분포")
+    _filters(p, None)
+    p.add_argument("--by", choices=["day", "week", "month"], default="week")
+
+    p = sub.add_parser("rollup", help="주간/월간 롤업 리포트 생성 (기본: 지난주/지난달)")
+    p.add_argument("--period", choices=["week", "month"], default="week")
+    p.add_argument("--date", type=main._parse_date, help="이 날짜가 속한 기간 (KST, YYYY-MM-DD)")
+    p.add_argument("--repo")
+    p.add_argument("--out-dir", default=main.OUT_DIR)
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=getattr(logging, main.LOG_LEVEL.upper(), logging.INFO),
+                        format="%(asctime)s %(levelname)-7s %(message)s")
+    for key in ("since", "until"):
+        if getattr(args, key, None):
+            setattr(args, key, getattr(args, key).isoformat())
+
+    store = main.analytics_store if main.analytics_store and args.db == main.ANALYTICS_DB else AnalyticsStore(args.db)
+    return {"import": cmd_import, "query": cmd_query, "trend": cmd_trend, "rollup": cmd_rollup}[args.command](store, args)
+
+if __name__ == "__main__":
+    sys.exit(main_cli())